@@ -1,36 +1,43 @@
 """
 Authentication utilities for Coastal Pollution Monitor
-Handles JWT token creation/verification and password hashing
+Handles JWT token creation/verification (password hashing lives in crypto.py)
 """
 
+import base64
+import hashlib
+import hmac
 import os
-from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+import orjson
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 
+# Password hashing lives in crypto.py; re-exported here for the routes
+from crypto import (
+    aget_password_hash,
+    averify_password,
+    calibrate_bcrypt_rounds,
+    get_password_hash,
+    verify_password,
+)
+
 # Configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "coastal-pollution-monitor-secret-key-change-in-production-2024")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "1440"))  # 24 hours
-
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+_SECRET_KEY_BYTES = SECRET_KEY.encode("utf-8")
 
 # OAuth2 scheme for token extraction
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
 
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a plain password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
-
-
-def get_password_hash(password: str) -> str:
-    """Generate password hash using bcrypt"""
-    return pwd_context.hash(password)
+# Decoded-token cache: raw token -> (exp epoch, payload)
+TOKEN_CACHE_SIZE = 4096
+_token_cache: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+_token_cache_lock = threading.Lock()
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -38,7 +45,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     Create a JWT access token
     
     Args:
-        data: Dictionary containing user data (sub, role, etc.)
+        data: Dictionary containing the token claims (sub)
         expires_delta: Optional custom expiration time
     
     Returns:
@@ -47,20 +54,39 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     to_encode = data.copy()
     
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = datetime.now(timezone.utc) + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    to_encode.update({"exp": int(expire.timestamp())})
+    payload_b64 = _b64url_encode(orjson.dumps(to_encode))
+    signing_input = f"{_JWT_HEADER_B64}.{payload_b64}"
+    signature = hmac.new(_SECRET_KEY_BYTES, signing_input.encode("ascii"), hashlib.sha256).digest()
     
-    return encoded_jwt
+    return f"{signing_input}.{_b64url_encode(signature)}"
+
+
+def _b64url_encode(data: bytes) -> str:
+    """Encode bytes as an unpadded base64url JWT segment"""
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64url_decode(segment: str) -> bytes:
+    """Decode an unpadded base64url JWT segment"""
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+# The header never changes, so it is encoded once
+_JWT_HEADER_B64 = _b64url_encode(orjson.dumps({"alg": ALGORITHM, "typ": "JWT"}))
 
 
 def decode_token(token: str) -> Optional[dict]:
     """
     Decode and verify a JWT token
     
+    Verifies the HS256 signature with hmac/hashlib directly and parses
+    the segments with orjson.
+    
     Args:
         token: JWT token string
     
@@ -68,13 +94,76 @@ def decode_token(token: str) -> Optional[dict]:
         Decoded token payload or None if invalid
     """
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        header_b64, payload_b64, signature_b64 = token.split(".")
+        signing_input = f"{header_b64}.{payload_b64}".encode("ascii")
+        expected = hmac.new(_SECRET_KEY_BYTES, signing_input, hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, _b64url_decode(signature_b64)):
+            return None
+        
+        header = orjson.loads(_b64url_decode(header_b64))
+        payload = orjson.loads(_b64url_decode(payload_b64))
+    except ValueError:
+        # Wrong number of segments, bad base64/JSON or non-ASCII input
+        return None
+    
+    if not isinstance(header, dict) or header.get("alg") != ALGORITHM:
+        return None
+    if not isinstance(payload, dict):
+        return None
+    
+    exp = payload.get("exp")
+    if exp is not None:
+        if not isinstance(exp, (int, float)) or time.time() >= exp:
+            return None
+    
+    return payload
+
+
+def decode_token_cached(token: str) -> Optional[dict]:
+    """
+    Decode a JWT token, reusing the payload of a previously verified token.
+    
+    Cached entries are only served until the token's `exp` claim passes,
+    after which the token is verified (and rejected) again.
+    """
+    now = time.time()
+    with _token_cache_lock:
+        cached = _token_cache.get(token)
+        if cached is not None:
+            if now < cached[0]:
+                _token_cache.move_to_end(token)
+                return cached[1]
+            del _token_cache[token]
+    
+    payload = decode_token(token)
+    if payload is None or "exp" not in payload:
         return payload
-    except JWTError:
+    
+    with _token_cache_lock:
+        _token_cache[token] = (float(payload["exp"]), payload)
+        if len(_token_cache) > TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+    
+    return payload
+
+
+def get_bearer_token(request: Request) -> Optional[str]:
+    """
+    Read a Bearer token straight from the Authorization header
+    Cheaper than the OAuth2 scheme for routes that mostly see anonymous traffic
+    """
+    authorization = request.headers.get("authorization")
+    if not authorization:
         return None
+    
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    
+    return token
 
 
-async def get_current_user_optional(token: str = Depends(oauth2_scheme)) -> Optional[dict]:
+async def get_current_user_optional(token: Optional[str] = Depends(get_bearer_token)) -> Optional[dict]:
     """
     Get current user from token (optional - returns None if no token)
     Use this for routes that work for both authenticated and unauthenticated users
@@ -82,7 +171,7 @@ async def get_current_user_optional(token: str = Depends(oauth2_scheme)) -> Opti
     if not token:
         return None
     
-    payload = decode_token(token)
+    payload = decode_token_cached(token)
     if payload is None:
         return None
     
@@ -111,7 +200,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
     if not token:
         raise credentials_exception
     
-    payload = decode_token(token)
+    payload = decode_token_cached(token)
     if payload is None:
         raise credentials_exception
     
@@ -152,14 +241,9 @@ def create_user_token_response(user: dict) -> dict:
     Returns:
         Dictionary with access_token, token_type, and user info
     """
-    access_token = create_access_token(
-        data={
-            "sub": str(user["id"]),
-            "email": user["email"],
-            "full_name": user["full_name"],
-            "role": user["role"]
-        }
-    )
+    # Only the user id goes into the token; profile and role are read
+    # from the (cached) user row on each request
+    access_token = create_access_token(data={"sub": str(user["id"])})
     
     return {
         "access_token": access_token,
@@ -0,0 +1,68 @@
+"""
+Password hashing for Coastal Pollution Monitor
+Shared by auth.py (login/signup) and database.py (default admin creation)
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+
+# Configuration
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# Dedicated pool for bcrypt so password checks don't block the event loop
+# or queue behind other threadpool work
+_bcrypt_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="bcrypt")
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a plain password against its hash"""
+    try:
+        return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+    except ValueError:
+        # Malformed hash
+        return False
+
+
+def get_password_hash(password: str) -> str:
+    """Generate password hash using bcrypt"""
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode("utf-8")
+
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the bcrypt executor (for async routes)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_bcrypt_executor, verify_password, plain_password, hashed_password)
+
+
+async def aget_password_hash(password: str) -> str:
+    """Hash a password on the bcrypt executor (for async routes)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_bcrypt_executor, get_password_hash, password)
+
+
+def calibrate_bcrypt_rounds(target_ms: float = 250, max_rounds: int = 16) -> int:
+    """
+    Find the highest bcrypt cost that hashes within the target latency
+    
+    Args:
+        target_ms: Per-hash latency budget in milliseconds
+        max_rounds: Upper bound on the rounds to try
+    
+    Returns:
+        Recommended value for BCRYPT_ROUNDS on this machine
+    """
+    recommended = 4
+    for rounds in range(4, max_rounds + 1):
+        salt = bcrypt.gensalt(rounds=rounds)
+        start = time.perf_counter()
+        bcrypt.hashpw(b"calibration", salt)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms > target_ms:
+            break
+        recommended = rounds
+    
+    print(f"🔐 bcrypt: {recommended} rounds fits a {target_ms:.0f}ms budget (BCRYPT_ROUNDS={BCRYPT_ROUNDS})")
+    return recommended
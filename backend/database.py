@@ -6,33 +6,222 @@ Updated with Users and NGOs tables for authentication
 """
 
 import sqlite3
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional, Tuple
 import os
-from passlib.context import CryptContext
-
-# Configuration for initial admin creation (to avoid circular import with auth.py)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from crypto import get_password_hash
 
 # Database file path
 DATABASE_PATH = os.path.join(os.path.dirname(__file__), "pollution.db")
 
+# One long-lived connection per thread (see get_connection)
+_local = threading.local()
+
+# TTL/LRU cache in front of get_user_by_id: user id -> (expires at, user row).
+# The cache is per process: invalidate_user_cache only clears the calling
+# worker, so with several uvicorn workers a role/profile change can be served
+# stale by the others for up to USER_CACHE_TTL seconds (kept short for that)
+USER_CACHE_TTL = 10
+USER_CACHE_SIZE = 1024
+_user_cache: "OrderedDict[int, Tuple[float, Dict]]" = OrderedDict()
+_user_cache_lock = threading.RLock()
+
+# Applied once when a connection is opened: WAL lets readers run alongside
+# the writer, and reads are served from a 256 MB memory map plus a 64 MB
+# page cache instead of read() syscalls
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+# ==================== SQL STATEMENTS ====================
+# Kept as module-level constants so every call hands sqlite3 the same
+# statement text and hits its prepared-statement cache
+
+_SQL_CREATE_USER = """
+    INSERT INTO users (full_name, email, password_hash, phone, role)
+    VALUES (?, ?, ?, ?, ?)
+    RETURNING id
+"""
+
+_SQL_GET_USER_BY_EMAIL = """
+    SELECT id, full_name, email, password_hash, phone, role, created_at, updated_at
+    FROM users WHERE email = ?
+"""
+
+_SQL_GET_USER_BY_ID = """
+    SELECT id, full_name, email, password_hash, phone, role, created_at, updated_at
+    FROM users WHERE id = ?
+"""
+
+_SQL_UPDATE_USER_PASSWORD = """
+    UPDATE users SET password_hash = ?, updated_at = CURRENT_TIMESTAMP
+    WHERE id = ?
+"""
+
+_SQL_INSERT_REPORT = """
+    INSERT INTO reports (image_path, latitude, longitude, pollution_type, confidence, description, user_id, status)
+    VALUES (?, ?, ?, ?, ?, ?, ?, 'pending')
+    RETURNING id
+"""
+
+_SQL_INSERT_REPORTS_BULK = """
+    INSERT INTO reports (image_path, latitude, longitude, pollution_type, confidence, description, user_id, status)
+    VALUES (?, ?, ?, ?, ?, ?, ?, 'pending')
+"""
+
+# Keyset pagination on the primary key (newest first); only the columns
+# the map and admin listings render are selected
+_SQL_GET_ALL_REPORTS = """
+    SELECT r.id, r.image_path, r.latitude, r.longitude, r.pollution_type,
+           r.confidence, r.description, r.created_at, r.status, r.ngo_id,
+           u.full_name as user_name,
+           n.name as ngo_name
+    FROM reports r
+    LEFT JOIN users u ON r.user_id = u.id
+    LEFT JOIN ngos n ON r.ngo_id = n.id
+    WHERE (? IS NULL OR r.id < ?)
+    ORDER BY r.id DESC
+    LIMIT ?
+"""
+
+_SQL_GET_REPORTS_BY_USER = """
+    SELECT r.id, r.image_path, r.latitude, r.longitude, r.pollution_type, 
+           r.confidence, r.description, r.created_at, r.status,
+           r.ngo_id, r.admin_notes, r.updated_at,
+           n.name as ngo_name
+    FROM reports r
+    LEFT JOIN ngos n ON r.ngo_id = n.id
+    WHERE r.user_id = ?
+    ORDER BY r.created_at DESC
+"""
+
+_SQL_GET_REPORT_BY_ID = """
+    SELECT r.id, r.image_path, r.latitude, r.longitude, r.pollution_type,
+           r.confidence, r.description, r.created_at, r.user_id, r.status,
+           r.ngo_id, r.admin_notes, r.updated_at,
+           u.full_name as user_name, u.email as user_email,
+           n.name as ngo_name, n.email as ngo_email
+    FROM reports r
+    LEFT JOIN users u ON r.user_id = u.id
+    LEFT JOIN ngos n ON r.ngo_id = n.id
+    WHERE r.id = ?
+"""
+
+_SQL_UPDATE_REPORT_STATUS_AND_NGO = """
+    UPDATE reports 
+    SET status = ?, ngo_id = ?, admin_notes = ?, updated_at = CURRENT_TIMESTAMP
+    WHERE id = ?
+"""
+
+_SQL_UPDATE_REPORT_STATUS = """
+    UPDATE reports 
+    SET status = ?, admin_notes = ?, updated_at = CURRENT_TIMESTAMP
+    WHERE id = ?
+"""
+
+# Single pass over reports with conditional aggregation
+# (COALESCE keeps the counts at 0 instead of NULL on an empty table)
+_SQL_GET_STATS = """
+    SELECT COUNT(*) AS total,
+           COALESCE(SUM(pollution_type = 'plastic'), 0) AS plastic,
+           COALESCE(SUM(pollution_type = 'oil_spill'), 0) AS oil_spill,
+           COALESCE(SUM(pollution_type IN ('other_solid_waste', 'general_waste')), 0) AS other_solid_waste,
+           COALESCE(SUM(pollution_type = 'marine_debris'), 0) AS marine_debris,
+           COALESCE(SUM(pollution_type = 'no_waste'), 0) AS no_waste,
+           COALESCE(SUM(COALESCE(NULLIF(status, ''), 'pending') = 'pending'), 0) AS pending,
+           COALESCE(SUM(status = 'forwarded'), 0) AS forwarded,
+           COALESCE(SUM(status = 'resolved'), 0) AS resolved
+    FROM reports
+"""
+
+_SQL_DELETE_REPORT = "DELETE FROM reports WHERE id = ?"
+
+_SQL_GET_REPORTS_VERSION = "SELECT instance, version FROM reports_meta WHERE id = 1"
+
+_SQL_GET_ALL_NGOS = """
+    SELECT id, name, email, phone, address, specialization, description, website, logo_url, created_at
+    FROM ngos
+    ORDER BY name
+"""
+
+_SQL_GET_NGO_BY_ID = """
+    SELECT id, name, email, phone, address, specialization, description, website, logo_url, created_at
+    FROM ngos WHERE id = ?
+"""
+
+_SQL_CREATE_NGO = """
+    INSERT INTO ngos (name, email, phone, address, specialization, description, website)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    RETURNING id
+"""
+
 
 def get_connection():
-    """Create a database connection with row factory for dict-like access"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row
+    """
+    Get this thread's database connection, opening it on first use.
+    
+    The connection is kept open and reused so pragmas and the schema
+    cache are only set up once per thread. Callers close their cursors,
+    not the connection.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(DATABASE_PATH, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        _local.conn = conn
     return conn
 
 
+def _fetch_dicts(cursor: sqlite3.Cursor) -> List[Dict]:
+    """
+    Fetch the remaining rows of an executed query as plain dicts.
+    
+    Column names are read once from cursor.description and zipped with
+    the raw row tuples, instead of building a sqlite3.Row per row and
+    copying it again with dict(row).
+    """
+    cursor.row_factory = None
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
 def init_database():
     """
     Initialize the database and create all tables if they don't exist.
     Call this on application startup.
+    
+    Schema creation, migrations and seed data run in a single
+    BEGIN IMMEDIATE transaction, so startup pays for one commit and
+    concurrent workers initializing the same file are serialized.
     """
     conn = get_connection()
     cursor = conn.cursor()
     
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        _create_schema_and_seed(cursor)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    
+    conn.commit()
+    print("✅ Database initialized successfully!")
+
+
+def _create_schema_and_seed(cursor: sqlite3.Cursor):
+    """Create tables, apply column migrations and insert default rows"""
     # Users table
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS users (
@@ -84,46 +273,63 @@ def init_database():
         )
     """)
     
-    # Check if columns exist, add them if not (for migration)
-    try:
-        cursor.execute("SELECT user_id FROM reports LIMIT 1")
-    except sqlite3.OperationalError:
-        cursor.execute("ALTER TABLE reports ADD COLUMN user_id INTEGER")
-    
-    try:
-        cursor.execute("SELECT status FROM reports LIMIT 1")
-    except sqlite3.OperationalError:
-        cursor.execute("ALTER TABLE reports ADD COLUMN status TEXT DEFAULT 'pending'")
-    
-    try:
-        cursor.execute("SELECT ngo_id FROM reports LIMIT 1")
-    except sqlite3.OperationalError:
-        cursor.execute("ALTER TABLE reports ADD COLUMN ngo_id INTEGER")
-    
-    try:
-        cursor.execute("SELECT admin_notes FROM reports LIMIT 1")
-    except sqlite3.OperationalError:
-        cursor.execute("ALTER TABLE reports ADD COLUMN admin_notes TEXT")
-    
-    try:
-        cursor.execute("SELECT updated_at FROM reports LIMIT 1")
-    except sqlite3.OperationalError:
+    # Add columns missing from older databases (for migration)
+    report_columns = {row[1] for row in cursor.execute("PRAGMA table_info(reports)")}
+    for col, ddl in [
+        ("user_id", "INTEGER"),
+        ("status", "TEXT DEFAULT 'pending'"),
+        ("ngo_id", "INTEGER"),
+        ("admin_notes", "TEXT"),
         # SQLite doesn't allow CURRENT_TIMESTAMP for ADD COLUMN DEFAULT
-        cursor.execute("ALTER TABLE reports ADD COLUMN updated_at TIMESTAMP")
+        ("updated_at", "TIMESTAMP"),
+    ]:
+        if col not in report_columns:
+            cursor.execute(f"ALTER TABLE reports ADD COLUMN {col} {ddl}")
 
     # NGO table migrations (add columns individually)
+    ngo_columns = {row[1] for row in cursor.execute("PRAGMA table_info(ngos)")}
     for col in ["address", "specialization", "description", "website", "logo_url", "created_at"]:
-        try:
-            cursor.execute(f"SELECT {col} FROM ngos LIMIT 1")
-        except sqlite3.OperationalError:
+        if col not in ngo_columns:
             cursor.execute(f"ALTER TABLE ngos ADD COLUMN {col} TEXT")
             if col == "created_at":
                 cursor.execute(f"UPDATE ngos SET {col} = CURRENT_TIMESTAMP WHERE {col} IS NULL")
     
+    # Indexes for the report listing filters/sorts and the stats GROUP BYs
+    # (created after the migrations above so the columns always exist)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_reports_user_created ON reports(user_id, created_at DESC)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_reports_ngo ON reports(ngo_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_reports_status ON reports(status)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_reports_type ON reports(pollution_type)")
+    
+    # Change counter for the report listings (used as the /api/reports ETag).
+    # Bumped by triggers on anything the listing shows, including the joined
+    # user and NGO names; instance changes whenever the database is recreated.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS reports_meta (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            instance TEXT NOT NULL,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO reports_meta (id, instance) VALUES (1, lower(hex(randomblob(8))))")
+    for name, event in [
+        ("reports_version_insert", "INSERT ON reports"),
+        ("reports_version_update", "UPDATE ON reports"),
+        ("reports_version_delete", "DELETE ON reports"),
+        ("reports_version_user_name", "UPDATE OF full_name ON users"),
+        ("reports_version_ngo_name", "UPDATE OF name ON ngos"),
+    ]:
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {name} AFTER {event}
+            BEGIN
+                UPDATE reports_meta SET version = version + 1 WHERE id = 1;
+            END
+        """)
+    
     # Create default admin user if not exists
     cursor.execute("SELECT id FROM users WHERE email = ?", ("admin@coastal.com",))
     if cursor.fetchone() is None:
-        admin_hash = pwd_context.hash("admin123")
+        admin_hash = get_password_hash("admin123")
         cursor.execute("""
             INSERT INTO users (full_name, email, password_hash, role)
             VALUES (?, ?, ?, ?)
@@ -156,10 +362,6 @@ def init_database():
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         """, sample_ngos)
         print("✅ Sample NGOs inserted")
-    
-    conn.commit()
-    conn.close()
-    print("✅ Database initialized successfully!")
 
 
 # ==================== USER OPERATIONS ====================
@@ -169,14 +371,11 @@ def create_user(full_name: str, email: str, password_hash: str, phone: Optional[
     conn = get_connection()
     cursor = conn.cursor()
     
-    cursor.execute("""
-        INSERT INTO users (full_name, email, password_hash, phone, role)
-        VALUES (?, ?, ?, ?, ?)
-    """, (full_name, email, password_hash, phone, role))
-    
-    user_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    with conn:
+        cursor.execute(_SQL_CREATE_USER, (full_name, email, password_hash, phone, role))
+        
+        user_id = cursor.fetchone()[0]
+    cursor.close()
     
     return user_id
 
@@ -186,13 +385,10 @@ def get_user_by_email(email: str) -> Optional[Dict]:
     conn = get_connection()
     cursor = conn.cursor()
     
-    cursor.execute("""
-        SELECT id, full_name, email, password_hash, phone, role, created_at, updated_at
-        FROM users WHERE email = ?
-    """, (email,))
+    cursor.execute(_SQL_GET_USER_BY_EMAIL, (email,))
     
     row = cursor.fetchone()
-    conn.close()
+    cursor.close()
     
     if row is None:
         return None
@@ -201,29 +397,44 @@ def get_user_by_email(email: str) -> Optional[Dict]:
 
 
 def get_user_by_id(user_id: int) -> Optional[Dict]:
-    """Get user by ID"""
+    """Get user by ID (served from a short-lived cache when possible)"""
+    now = time.monotonic()
+    with _user_cache_lock:
+        cached = _user_cache.get(user_id)
+        if cached is not None and now < cached[0]:
+            _user_cache.move_to_end(user_id)
+            # Copies, so callers can't mutate the cached row
+            return dict(cached[1])
+    
     conn = get_connection()
     cursor = conn.cursor()
     
-    cursor.execute("""
-        SELECT id, full_name, email, password_hash, phone, role, created_at, updated_at
-        FROM users WHERE id = ?
-    """, (user_id,))
+    cursor.execute(_SQL_GET_USER_BY_ID, (user_id,))
     
     row = cursor.fetchone()
-    conn.close()
+    cursor.close()
     
     if row is None:
         return None
     
-    return dict(row)
+    user = dict(row)
+    with _user_cache_lock:
+        _user_cache[user_id] = (now + USER_CACHE_TTL, dict(user))
+        _user_cache.move_to_end(user_id)
+        if len(_user_cache) > USER_CACHE_SIZE:
+            _user_cache.popitem(last=False)
+    
+    return user
+
+
+def invalidate_user_cache(user_id: int) -> None:
+    """Drop a user from the get_user_by_id cache after it changes"""
+    with _user_cache_lock:
+        _user_cache.pop(user_id, None)
 
 
 def update_user(user_id: int, full_name: Optional[str] = None, phone: Optional[str] = None) -> bool:
     """Update user profile"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
     updates = []
     params = []
     
@@ -235,19 +446,22 @@ def update_user(user_id: int, full_name: Optional[str] = None, phone: Optional[s
         params.append(phone)
     
     if not updates:
-        conn.close()
         return False
     
     updates.append("updated_at = CURRENT_TIMESTAMP")
     params.append(user_id)
     
-    cursor.execute(f"""
-        UPDATE users SET {', '.join(updates)} WHERE id = ?
-    """, params)
+    conn = get_connection()
+    cursor = conn.cursor()
     
-    updated = cursor.rowcount > 0
-    conn.commit()
-    conn.close()
+    with conn:
+        cursor.execute(f"""
+            UPDATE users SET {', '.join(updates)} WHERE id = ?
+        """, params)
+        
+        updated = cursor.rowcount > 0
+    cursor.close()
+    invalidate_user_cache(user_id)
     
     return updated
 
@@ -257,14 +471,12 @@ def update_user_password(user_id: int, password_hash: str) -> bool:
     conn = get_connection()
     cursor = conn.cursor()
     
-    cursor.execute("""
-        UPDATE users SET password_hash = ?, updated_at = CURRENT_TIMESTAMP
-        WHERE id = ?
-    """, (password_hash, user_id))
-    
-    updated = cursor.rowcount > 0
-    conn.commit()
-    conn.close()
+    with conn:
+        cursor.execute(_SQL_UPDATE_USER_PASSWORD, (password_hash, user_id))
+        
+        updated = cursor.rowcount > 0
+    cursor.close()
+    invalidate_user_cache(user_id)
     
     return updated
 
@@ -298,44 +510,82 @@ def insert_report(
     conn = get_connection()
     cursor = conn.cursor()
     
-    cursor.execute("""
-        INSERT INTO reports (image_path, latitude, longitude, pollution_type, confidence, description, user_id, status)
-        VALUES (?, ?, ?, ?, ?, ?, ?, 'pending')
-    """, (image_path, latitude, longitude, pollution_type, confidence, description, user_id))
-    
-    report_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    with conn:
+        cursor.execute(_SQL_INSERT_REPORT, (image_path, latitude, longitude, pollution_type, confidence, description, user_id))
+        
+        report_id = cursor.fetchone()[0]
+    cursor.close()
     
     return report_id
 
 
-def get_all_reports() -> List[Dict]:
+def insert_reports_bulk(reports: List[Tuple]) -> int:
     """
-    Retrieve all pollution reports from the database.
+    Insert many pollution reports in a single transaction.
+    
+    Args:
+        reports: Tuples of (image_path, latitude, longitude, pollution_type,
+                 confidence, description, user_id), as for insert_report
     
     Returns:
-        List of report dictionaries ordered by creation date (newest first)
+        Number of reports inserted
     """
     conn = get_connection()
     cursor = conn.cursor()
     
-    cursor.execute("""
-        SELECT r.id, r.image_path, r.latitude, r.longitude, r.pollution_type, 
-               r.confidence, r.description, r.created_at, r.user_id, r.status,
-               r.ngo_id, r.admin_notes, r.updated_at,
-               u.full_name as user_name, u.email as user_email,
-               n.name as ngo_name
-        FROM reports r
-        LEFT JOIN users u ON r.user_id = u.id
-        LEFT JOIN ngos n ON r.ngo_id = n.id
-        ORDER BY r.created_at DESC
-    """)
+    with conn:
+        cursor.executemany(_SQL_INSERT_REPORTS_BULK, reports)
+        
+        count = cursor.rowcount
+    cursor.close()
+    
+    return count
+
+
+def get_all_reports(limit: int = 50, before_id: Optional[int] = None) -> List[Dict]:
+    """
+    Retrieve a page of pollution reports from the database.
     
-    rows = cursor.fetchall()
-    conn.close()
+    Args:
+        limit: Maximum number of reports to return
+        before_id: Only return reports older than this report ID
+            (pass the last ID of the previous page to get the next one)
     
-    return [dict(row) for row in rows]
+    Returns:
+        List of report dictionaries ordered newest first
+    """
+    return [row for batch in iter_all_reports(limit=limit, before_id=before_id, batch_size=limit) for row in batch]
+
+
+def iter_all_reports(limit: int = 50, before_id: Optional[int] = None, batch_size: int = 200) -> Iterator[List[Dict]]:
+    """
+    Stream a page of pollution reports in batches.
+    
+    Returns the same rows as get_all_reports, but pulls them with
+    fetchmany so the whole page is never held in memory at once.
+    
+    Args:
+        limit: Maximum number of reports to return
+        before_id: Only return reports older than this report ID
+        batch_size: Number of rows fetched per batch
+    
+    Yields:
+        Lists of up to batch_size report dictionaries, newest first
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    
+    try:
+        cursor.execute(_SQL_GET_ALL_REPORTS, (before_id, before_id, limit))
+        columns = [column[0] for column in cursor.description]
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield [dict(zip(columns, row)) for row in rows]
+    finally:
+        cursor.close()
 
 
 def get_reports_by_user(user_id: int) -> List[Dict]:
@@ -343,21 +593,12 @@ def get_reports_by_user(user_id: int) -> List[Dict]:
     conn = get_connection()
     cursor = conn.cursor()
     
-    cursor.execute("""
-        SELECT r.id, r.image_path, r.latitude, r.longitude, r.pollution_type, 
-               r.confidence, r.description, r.created_at, r.status,
-               r.ngo_id, r.admin_notes, r.updated_at,
-               n.name as ngo_name
-        FROM reports r
-        LEFT JOIN ngos n ON r.ngo_id = n.id
-        WHERE r.user_id = ?
-        ORDER BY r.created_at DESC
-    """, (user_id,))
+    cursor.execute(_SQL_GET_REPORTS_BY_USER, (user_id,))
     
-    rows = cursor.fetchall()
-    conn.close()
+    rows = _fetch_dicts(cursor)
+    cursor.close()
     
-    return [dict(row) for row in rows]
+    return rows
 
 
 def get_report_by_id(report_id: int) -> Optional[Dict]:
@@ -373,20 +614,10 @@ def get_report_by_id(report_id: int) -> Optional[Dict]:
     conn = get_connection()
     cursor = conn.cursor()
     
-    cursor.execute("""
-        SELECT r.id, r.image_path, r.latitude, r.longitude, r.pollution_type,
-               r.confidence, r.description, r.created_at, r.user_id, r.status,
-               r.ngo_id, r.admin_notes, r.updated_at,
-               u.full_name as user_name, u.email as user_email,
-               n.name as ngo_name, n.email as ngo_email
-        FROM reports r
-        LEFT JOIN users u ON r.user_id = u.id
-        LEFT JOIN ngos n ON r.ngo_id = n.id
-        WHERE r.id = ?
-    """, (report_id,))
+    cursor.execute(_SQL_GET_REPORT_BY_ID, (report_id,))
     
     row = cursor.fetchone()
-    conn.close()
+    cursor.close()
     
     if row is None:
         return None
@@ -399,77 +630,64 @@ def update_report_status(report_id: int, status: str, ngo_id: Optional[int] = No
     conn = get_connection()
     cursor = conn.cursor()
     
-    if ngo_id is not None:
-        cursor.execute("""
-            UPDATE reports 
-            SET status = ?, ngo_id = ?, admin_notes = ?, updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        """, (status, ngo_id, admin_notes, report_id))
-    else:
-        cursor.execute("""
-            UPDATE reports 
-            SET status = ?, admin_notes = ?, updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        """, (status, admin_notes, report_id))
-    
-    updated = cursor.rowcount > 0
-    conn.commit()
-    conn.close()
+    with conn:
+        if ngo_id is not None:
+            cursor.execute(_SQL_UPDATE_REPORT_STATUS_AND_NGO, (status, ngo_id, admin_notes, report_id))
+        else:
+            cursor.execute(_SQL_UPDATE_REPORT_STATUS, (status, admin_notes, report_id))
+        
+        updated = cursor.rowcount > 0
+    cursor.close()
     
     return updated
 
 
-def get_stats() -> Dict:
+def get_reports_version() -> str:
     """
-    Get pollution statistics from the database.
+    Get a token that changes whenever the report listings would change.
     
     Returns:
-        Dictionary containing total count and count by pollution type
+        "<instance>-<version>" string, suitable for use as an ETag
     """
     conn = get_connection()
     cursor = conn.cursor()
     
-    # Get total count
-    cursor.execute("SELECT COUNT(*) as total FROM reports")
-    total = cursor.fetchone()["total"]
+    cursor.execute(_SQL_GET_REPORTS_VERSION)
     
-    # Get count by pollution type
-    cursor.execute("""
-        SELECT pollution_type, COUNT(*) as count
-        FROM reports
-        GROUP BY pollution_type
-    """)
+    row = cursor.fetchone()
+    cursor.close()
     
-    type_counts = {}
-    for row in cursor.fetchall():
-        type_counts[row["pollution_type"]] = row["count"]
+    return f"{row['instance']}-{row['version']}"
+
+
+def get_stats() -> Dict:
+    """
+    Get pollution statistics from the database.
     
-    # Get count by status
-    cursor.execute("""
-        SELECT status, COUNT(*) as count
-        FROM reports
-        GROUP BY status
-    """)
+    Returns:
+        Dictionary containing total count and count by pollution type
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
     
-    status_counts = {}
-    for row in cursor.fetchall():
-        status_counts[row["status"] or "pending"] = row["count"]
+    cursor.execute(_SQL_GET_STATS)
     
-    conn.close()
+    row = cursor.fetchone()
+    cursor.close()
     
     return {
-        "total": total,
+        "total": row["total"],
         "by_type": {
-            "plastic": type_counts.get("plastic", 0),
-            "oil_spill": type_counts.get("oil_spill", 0),
-            "other_solid_waste": type_counts.get("other_solid_waste", 0) + type_counts.get("general_waste", 0),
-            "marine_debris": type_counts.get("marine_debris", 0),
-            "no_waste": type_counts.get("no_waste", 0)
+            "plastic": row["plastic"],
+            "oil_spill": row["oil_spill"],
+            "other_solid_waste": row["other_solid_waste"],
+            "marine_debris": row["marine_debris"],
+            "no_waste": row["no_waste"]
         },
         "by_status": {
-            "pending": status_counts.get("pending", 0),
-            "forwarded": status_counts.get("forwarded", 0),
-            "resolved": status_counts.get("resolved", 0)
+            "pending": row["pending"],
+            "forwarded": row["forwarded"],
+            "resolved": row["resolved"]
         }
     }
 
@@ -487,11 +705,11 @@ def delete_report(report_id: int) -> bool:
     conn = get_connection()
     cursor = conn.cursor()
     
-    cursor.execute("DELETE FROM reports WHERE id = ?", (report_id,))
-    
-    deleted = cursor.rowcount > 0
-    conn.commit()
-    conn.close()
+    with conn:
+        cursor.execute(_SQL_DELETE_REPORT, (report_id,))
+        
+        deleted = cursor.rowcount > 0
+    cursor.close()
     
     return deleted
 
@@ -503,16 +721,12 @@ def get_all_ngos() -> List[Dict]:
     conn = get_connection()
     cursor = conn.cursor()
     
-    cursor.execute("""
-        SELECT id, name, email, phone, address, specialization, description, website, logo_url, created_at
-        FROM ngos
-        ORDER BY name
-    """)
+    cursor.execute(_SQL_GET_ALL_NGOS)
     
-    rows = cursor.fetchall()
-    conn.close()
+    rows = _fetch_dicts(cursor)
+    cursor.close()
     
-    return [dict(row) for row in rows]
+    return rows
 
 
 def get_ngo_by_id(ngo_id: int) -> Optional[Dict]:
@@ -520,13 +734,10 @@ def get_ngo_by_id(ngo_id: int) -> Optional[Dict]:
     conn = get_connection()
     cursor = conn.cursor()
     
-    cursor.execute("""
-        SELECT id, name, email, phone, address, specialization, description, website, logo_url, created_at
-        FROM ngos WHERE id = ?
-    """, (ngo_id,))
+    cursor.execute(_SQL_GET_NGO_BY_ID, (ngo_id,))
     
     row = cursor.fetchone()
-    conn.close()
+    cursor.close()
     
     if row is None:
         return None
@@ -541,14 +752,11 @@ def create_ngo(name: str, email: str, phone: Optional[str] = None, address: Opti
     conn = get_connection()
     cursor = conn.cursor()
     
-    cursor.execute("""
-        INSERT INTO ngos (name, email, phone, address, specialization, description, website)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    """, (name, email, phone, address, specialization, description, website))
-    
-    ngo_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+    with conn:
+        cursor.execute(_SQL_CREATE_NGO, (name, email, phone, address, specialization, description, website))
+        
+        ngo_id = cursor.fetchone()[0]
+    cursor.close()
     
     return ngo_id
 
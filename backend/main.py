@@ -7,17 +7,21 @@ Endpoints:
 - POST /api/auth/login - Login user
 - GET /api/auth/me - Get current user profile
 - POST /api/upload - Upload pollution report (Authenticated)
-- GET /api/reports - Get all reports (Public, for map)
+- GET /api/reports - Get reports, newest first (Public, for map; paginated with ?limit=&before_id=)
 - GET /api/reports/my - Get user's reports (Authenticated)
 - GET /api/ngos - List NGOs (Public)
-- GET /api/admin/reports - Get all reports with details (Admin)
+- GET /api/admin/reports - Get reports with details (Admin; paginated like /api/reports)
 - PATCH /api/admin/reports/{id}/status - Update report status (Admin)
 """
 
+import asyncio
+import io
 import os
-from typing import List, Optional
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends, status, BackgroundTasks
+from typing import AsyncIterator, BinaryIO, Iterable, List, Optional
+import orjson
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends, Query, Request, Response, status, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import BaseModel, EmailStr
@@ -25,12 +29,13 @@ from pydantic import BaseModel, EmailStr
 # Custom modules
 import database
 import auth
-from ml_model import analyze_image, extract_gps_data
+from ml_model import EXIF_HEADER_BYTES, analyze_image, content_hasher, extract_gps_data
 
 app = FastAPI(
     title="Coastal Pollution Monitor API",
     description="Backend API for Coastal Pollution Monitor with Auth & RBAC",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS Configuration - Read from environment variable
@@ -49,6 +54,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Report listing page size. Pages are newest first: the next cursor is the last
+# row's id (?before_id=<id>), and a page shorter than ?limit= is the last one
+REPORTS_PAGE_LIMIT = 500
+REPORTS_PAGE_LIMIT_MAX = 1000
+
+# Uploads are copied to disk through a buffer of this size
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
 # Create uploads directory if it doesn't exist
 UPLOAD_DIR = os.path.join(os.path.dirname(__file__), "uploads")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
@@ -60,6 +73,8 @@ app.mount("/static/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
 @app.on_event("startup")
 def startup_event():
     database.init_database()
+    if os.getenv("BCRYPT_CALIBRATE"):
+        auth.calibrate_bcrypt_rounds()
 
 # Pydantic models for request/response bodies
 class UserCreate(BaseModel):
@@ -82,6 +97,31 @@ class ReportStatusUpdate(BaseModel):
     ngo_id: Optional[int] = None
     admin_notes: Optional[str] = None
 
+async def _stream_json_array(batches: Iterable[List[dict]]) -> AsyncIterator[bytes]:
+    """Encode batches of rows as a single JSON array, one chunk per batch"""
+    yield b"["
+    separator = b""
+    for batch in batches:
+        # Drop each batch's own brackets so the chunks join into one array
+        yield separator + orjson.dumps(batch)[1:-1]
+        separator = b","
+    yield b"]"
+
+def _reports_etag() -> str:
+    """Weak ETag for the report listings, from the database change counter"""
+    return f'W/"{database.get_reports_version()}"'
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Check If-None-Match against an ETag (weak comparison)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip() == "*" or tag.strip().removeprefix("W/") == opaque
+        for tag in header.split(",")
+    )
+
 # ==================== AUTHENTICATION ENDPOINTS ====================
 
 @app.post("/api/auth/signup", response_model=Token)
@@ -95,7 +135,7 @@ async def signup(user: UserCreate):
         )
     
     # Hash password
-    hashed_password = auth.get_password_hash(user.password)
+    hashed_password = await auth.aget_password_hash(user.password)
     
     # Create user
     user_id = database.create_user(
@@ -116,7 +156,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     """Login with username (email) and password"""
     user = database.get_user_by_email(form_data.username)
     
-    if not user or not auth.verify_password(form_data.password, user["password_hash"]):
+    if not user or not await auth.averify_password(form_data.password, user["password_hash"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -128,10 +168,24 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
 @app.get("/api/auth/me")
 async def read_users_me(current_user: dict = Depends(auth.get_current_user)):
     """Get current logged in user profile"""
-    return current_user
+    return {key: value for key, value in current_user.items() if key != "password_hash"}
 
 # ==================== USER REPORTING ENDPOINTS ====================
 
+def _save_upload(src: BinaryIO, path: str) -> str:
+    """
+    Stream an upload to disk in fixed-size chunks (run via asyncio.to_thread)
+    
+    Returns:
+        Content hash of the upload, computed from the same chunks
+    """
+    hasher = content_hasher()
+    with open(path, "wb") as buffer:
+        while chunk := src.read(UPLOAD_CHUNK_SIZE):
+            hasher.update(chunk)
+            buffer.write(chunk)
+    return hasher.hexdigest()
+
 @app.post("/api/upload")
 async def upload_report(
     image: UploadFile = File(..., description="Image file of the pollution"),
@@ -150,13 +204,11 @@ async def upload_report(
         filename = f"{uuid.uuid4()}{file_extension}"
         file_path = os.path.join(UPLOAD_DIR, filename)
         
-        # Save file to disk
-        with open(file_path, "wb") as buffer:
-            content = await image.read()
-            buffer.write(content)
+        # Stream file to disk without buffering the whole upload in memory
+        content_hash = await asyncio.to_thread(_save_upload, image.file, file_path)
             
-        # Analyze image with AI model
-        detection_result = analyze_image(file_path)
+        # Analyze image with AI model (identical re-uploads hit the result cache)
+        detection_result = await analyze_image(file_path, content_hash)
         
         # Store in database
         # Convert path to URL-friendly format for frontend
@@ -198,26 +250,10 @@ async def extract_gps_endpoint(
 ):
     """Extract GPS coordinates from image EXIF metadata (Helper endpoint)"""
     try:
-        # Save strictly to memory for extraction, but since extract_gps_data expects path or bytes
-        # let's read bytes
-        content = await image.read()
+        # EXIF sits in the JPEG header, so only the start of the file is needed
+        content = await image.read(EXIF_HEADER_BYTES)
+        gps_data = await asyncio.to_thread(extract_gps_data, io.BytesIO(content))
         
-        # We need to save to a temp file because our helper uses PIL.Image.open
-        # or we can modify helper. For now let's save to temp
-        import tempfile
-        
-        with tempfile.NamedTemporaryFile(delete=False) as temp:
-            temp.write(content)
-            temp_path = temp.name
-            
-        gps_data = extract_gps_data(temp_path)
-        
-        # Clean up
-        try:
-            os.unlink(temp_path)
-        except:
-            pass
-            
         return gps_data or {"latitude": None, "longitude": None}
         
     except Exception as e:
@@ -232,9 +268,22 @@ async def get_my_reports(current_user: dict = Depends(auth.get_current_user)):
 # ==================== PUBLIC ENDPOINTS ====================
 
 @app.get("/api/reports")
-async def list_reports():
-    """Get all reports (Public access for Map)"""
-    return database.get_all_reports()
+async def list_reports(
+    request: Request,
+    limit: int = Query(REPORTS_PAGE_LIMIT, ge=1, le=REPORTS_PAGE_LIMIT_MAX),
+    before_id: Optional[int] = None
+):
+    """Get a page of reports, newest first (Public access for Map)"""
+    etag = _reports_etag()
+    if _etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    batches = database.iter_all_reports(limit=limit, before_id=before_id)
+    return StreamingResponse(
+        _stream_json_array(batches),
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": "no-cache"}
+    )
 
 @app.get("/api/reports/{report_id}")
 async def get_single_report(report_id: int):
@@ -257,9 +306,23 @@ async def get_statistics():
 # ==================== ADMIN ENDPOINTS ====================
 
 @app.get("/api/admin/reports")
-async def list_admin_reports(current_user: dict = Depends(auth.get_current_admin)):
-    """Get all reports (Admin access - same as public list for now but could include more fields)"""
-    return database.get_all_reports()
+async def list_admin_reports(
+    request: Request,
+    limit: int = Query(REPORTS_PAGE_LIMIT, ge=1, le=REPORTS_PAGE_LIMIT_MAX),
+    before_id: Optional[int] = None,
+    current_user: dict = Depends(auth.get_current_admin)
+):
+    """Get a page of reports (Admin access - same as public list for now but could include more fields)"""
+    etag = _reports_etag()
+    if _etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    batches = database.iter_all_reports(limit=limit, before_id=before_id)
+    return StreamingResponse(
+        _stream_json_array(batches),
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": "private, no-cache"}
+    )
 
 @app.patch("/api/admin/reports/{report_id}/status")
 async def update_report_status(
@@ -304,4 +367,7 @@ async def root():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Multiple worker processes let uploads classify in parallel across cores;
+    # "auto" picks uvloop/httptools when installed (uvicorn[standard])
+    workers = int(os.getenv("WEB_CONCURRENCY", max(2, (os.cpu_count() or 1) // 2)))
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, loop="auto", http="auto", workers=workers)
@@ -5,117 +5,561 @@ Uses CLIP (Contrastive Language-Image Pre-training) for high-accuracy
 zero-shot classification. No training required.
 """
 
-from PIL import Image
+from PIL import Image, UnidentifiedImageError
 import numpy as np
+import asyncio
+import hashlib
+import io
 import os
+import struct
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
+from typing import BinaryIO, Optional, Union
 
-# Try to import CLIP
-try:
-    from transformers import CLIPProcessor, CLIPModel
+# Labels designed to only match OBVIOUS pollution
+# Order: plastic, oil_spill, solid_waste, marine_debris, no_waste
+LABELS = [
+    "plastic bottles and plastic bags littering a beach with visible garbage",
+    "oil spill petroleum contamination dark brown black murky polluted water",
+    "garbage pile trash heap rubbish dump on sandy beach",
+    "fishing nets ropes tangled in water or on beach shore",
+    "natural clean ocean water waves sea view without any garbage or pollution"
+]
+
+# CLIP ViT-B/32 input resolution
+CLIP_INPUT_SIZE = 224
+
+# Inference precision: int8 dynamic quantization on CPU, fp16 on CUDA
+# Set CLIP_QUANTIZE=0 to keep the full fp32 model
+CLIP_QUANTIZE = os.getenv("CLIP_QUANTIZE", "1") != "0"
+
+# Inference backend: "torch" (default), "compile" (torch.compile'd image
+# tower), "torchscript" (frozen trace saved under CLIP_TORCHSCRIPT_DIR, reloaded
+# on later starts without the HF model) or "onnx" (ONNX Runtime on CPU,
+# exported once to CLIP_ONNX_PATH on first use)
+CLIP_RUNTIME = os.getenv("CLIP_RUNTIME", "torch")
+CLIP_ONNX_PATH = Path(os.getenv("CLIP_ONNX_PATH", Path(__file__).parent / "models" / "clip_vit_b32.onnx"))
+CLIP_TORCHSCRIPT_DIR = Path(os.getenv("CLIP_TORCHSCRIPT_DIR", Path(__file__).parent / "models"))
+
+
+def _vision_tower(clip_model):
+    """Wrap get_image_features as a module taking only pixel_values (for export)."""
     import torch
-    model = CLIPModel.from_pretrained("openai/clip-vit-base-patch32")
-    processor = CLIPProcessor.from_pretrained("openai/clip-vit-base-patch32")
-    USE_CLIP = True
-    print("✅ CLIP model loaded successfully!")
+    
+    class VisionTower(torch.nn.Module):
+        def __init__(self, clip):
+            super().__init__()
+            self.clip = clip
+        
+        def forward(self, pixel_values):
+            return self.clip.get_image_features(pixel_values=pixel_values)
+    
+    return VisionTower(clip_model).eval()
+
+
+@contextmanager
+def _atomic_path(path: Path):
+    """Yield a temp path next to `path`, moved into place only if the block succeeds.
+    
+    Several server workers may export the same model file on first start; readers
+    must never see a half-written one.
+    """
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def _onnx_session(clip_model):
+    """Export the CLIP image tower to ONNX (once) and open an optimized session."""
+    import onnxruntime as ort
+    import torch
+    
+    if not CLIP_ONNX_PATH.exists():
+        CLIP_ONNX_PATH.parent.mkdir(parents=True, exist_ok=True)
+        dummy = torch.zeros(1, 3, CLIP_INPUT_SIZE, CLIP_INPUT_SIZE)
+        with _atomic_path(CLIP_ONNX_PATH) as tmp_path:
+            torch.onnx.export(
+                _vision_tower(clip_model), (dummy,), str(tmp_path),
+                input_names=["pixel_values"], output_names=["image_embeds"],
+                # Batch stays dynamic so ClipBatcher can stack requests
+                dynamic_axes={"pixel_values": {0: "batch"}, "image_embeds": {0: "batch"}},
+                opset_version=17
+            )
+        print(f"✅ Exported CLIP image tower to {CLIP_ONNX_PATH}")
+    
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return ort.InferenceSession(str(CLIP_ONNX_PATH), options, providers=["CPUExecutionProvider"])
+
+
+class _Clip:
+    """CLIP model, processor and cached label features, ready for inference."""
+    
+    def __init__(self):
+        import torch
+        from transformers import CLIPProcessor, CLIPModel
+        
+        self.processor = CLIPProcessor.from_pretrained("openai/clip-vit-base-patch32")
+        self.runtime = CLIP_RUNTIME
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.dtype = torch.float32
+        
+        if self.runtime == "torchscript" and self._load_torchscript():
+            print("✅ CLIP model loaded successfully! (TorchScript)")
+            return
+        
+        self.model = CLIPModel.from_pretrained("openai/clip-vit-base-patch32")
+        self.model.eval()
+        
+        # The labels never change, so encode them once (in fp32) instead of per request
+        with torch.inference_mode():
+            text_feats = self.model.get_text_features(**self.processor(text=LABELS, return_tensors="pt", padding=True))
+            text_feats = text_feats / text_feats.norm(dim=-1, keepdim=True)
+            logit_scale = self.model.logit_scale.exp()
+        
+        if self.runtime == "onnx":
+            try:
+                self.session = _onnx_session(self.model)
+                self.pixel_mean = np.array(self.processor.image_processor.image_mean, dtype=np.float32)
+                self.pixel_std = np.array(self.processor.image_processor.image_std, dtype=np.float32)
+            except ImportError:
+                print("⚠️ onnxruntime not available, using PyTorch for CLIP")
+                self.runtime = "torch"
+            except Exception as e:
+                # Failed export or a corrupt/stale cached model: re-export on next start
+                print(f"⚠️ ONNX CLIP failed ({e}), using PyTorch for CLIP")
+                CLIP_ONNX_PATH.unlink(missing_ok=True)
+                self.runtime = "torch"
+        
+        if self.runtime == "onnx":
+            self.text_feats = text_feats.numpy()
+            self.logit_scale = logit_scale.item()
+        else:
+            if CLIP_QUANTIZE and self.device == "cuda":
+                self.dtype = torch.float16
+                self.model = self.model.to(self.device).half()
+            elif CLIP_QUANTIZE:
+                self.model = torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+            else:
+                self.model = self.model.to(self.device)
+            
+            self.text_feats = text_feats.to(self.device, self.dtype)
+            self.logit_scale = logit_scale.to(self.device, self.dtype)
+            self.image_features = lambda pixel_values: self.model.get_image_features(pixel_values=pixel_values)
+        
+        if self.runtime == "compile":
+            self._compile_vision_model()
+        elif self.runtime == "torchscript":
+            self._save_torchscript()
+        print("✅ CLIP model loaded successfully!")
+    
+    @property
+    def _torchscript_path(self) -> Path:
+        precision = "fp32" if not CLIP_QUANTIZE else ("fp16" if self.device == "cuda" else "int8")
+        return CLIP_TORCHSCRIPT_DIR / f"clip_vision_{self.device}_{precision}.pt"
+    
+    def _load_torchscript(self) -> bool:
+        """Load a saved trace plus its label features; False if missing or stale."""
+        import torch
+        
+        path = self._torchscript_path
+        if not path.exists():
+            return False
+        
+        extra_files = {"text_feats.pt": ""}
+        try:
+            vision = torch.jit.load(str(path), map_location=self.device, _extra_files=extra_files)
+            cached = torch.load(io.BytesIO(extra_files["text_feats.pt"]), map_location=self.device)
+        except Exception as e:
+            # Truncated, corrupt or saved by another torch version: rebuild it
+            print(f"⚠️ Could not load CLIP TorchScript trace ({e}), rebuilding")
+            return False
+        if cached["labels"] != LABELS:
+            return False
+        
+        if CLIP_QUANTIZE and self.device == "cuda":
+            self.dtype = torch.float16
+        self.text_feats = cached["text_feats"]
+        self.logit_scale = cached["logit_scale"]
+        self.image_features = vision
+        return True
+    
+    def _save_torchscript(self):
+        """Trace and freeze the image tower, saving it with the label features."""
+        import torch
+        
+        path = self._torchscript_path
+        try:
+            dummy = torch.zeros(1, 3, CLIP_INPUT_SIZE, CLIP_INPUT_SIZE, device=self.device, dtype=self.dtype)
+            with torch.no_grad():
+                vision = torch.jit.freeze(torch.jit.trace(_vision_tower(self.model), dummy))
+            
+            feats = io.BytesIO()
+            torch.save({"labels": LABELS, "text_feats": self.text_feats, "logit_scale": self.logit_scale}, feats)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with _atomic_path(path) as tmp_path:
+                torch.jit.save(vision, str(tmp_path), _extra_files={"text_feats.pt": feats.getvalue()})
+        except Exception as e:
+            print(f"⚠️ TorchScript trace failed ({e}), using eager CLIP")
+            return
+        
+        self.image_features = vision
+        print(f"✅ Saved CLIP TorchScript trace to {path}")
+    
+    def _compile_vision_model(self):
+        """Compile the image tower with Inductor and pay the compile cost up front."""
+        import torch
+        
+        eager = self.model.vision_model
+        try:
+            # Default mode (no CUDA graphs): ClipBatcher sends batches of 1..8, and
+            # per-shape graph recordings would happen during live requests
+            self.model.vision_model = torch.compile(eager, dynamic=None)
+            # The second size makes Dynamo recompile once with a dynamic batch dim,
+            # so later batch sizes reuse that graph
+            with torch.inference_mode():
+                for batch_size in (1, 2):
+                    dummy = torch.zeros(batch_size, 3, CLIP_INPUT_SIZE, CLIP_INPUT_SIZE, device=self.device, dtype=self.dtype)
+                    self.model.get_image_features(pixel_values=dummy)
+        except Exception as e:
+            print(f"⚠️ torch.compile failed ({e}), using eager CLIP")
+            self.model.vision_model = eager
+
+
+@lru_cache(maxsize=1)
+def _load_clip() -> Optional[_Clip]:
+    try:
+        return _Clip()
+    except ImportError:
+        print("⚠️ CLIP not available. Installing...")
+        return None
+
+
+_clip_lock = threading.Lock()
+
+
+def _get_clip() -> Optional[_Clip]:
+    """Load CLIP on first use; None if transformers/torch are not installed."""
+    with _clip_lock:
+        return _load_clip()
+
+
+# Optional header-only EXIF reader; falls back to PIL's parser
+try:
+    import piexif
+    USE_PIEXIF = True
 except ImportError:
-    USE_CLIP = False
-    print("⚠️ CLIP not available. Installing...")
+    USE_PIEXIF = False
+
+# Content hashing for the classification cache: BLAKE3 if installed, else BLAKE2b
+try:
+    from blake3 import blake3 as content_hasher
+except ImportError:
+    def content_hasher():
+        return hashlib.blake2b(digest_size=32)
+
+# Classification results keyed by upload content hash: hash -> (label, confidence)
+CLASSIFY_CACHE_SIZE = 4096
+_classify_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_classify_cache_lock = threading.Lock()
+
+# EXIF (APP1) is limited to 64 KiB and sits at the start of a JPEG
+EXIF_HEADER_BYTES = 128 * 1024
 
 CATEGORIES = ['plastic', 'oil_spill', 'other_solid_waste', 'marine_debris', 'no_waste']
 
-def classify_pollution(image_path: str) -> tuple:
-    """Classify pollution using CLIP AI."""
+def _load_image(image_path: str) -> Optional[Image.Image]:
+    """Open and decode an upload, or None if it is not a readable image."""
     if not os.path.exists(image_path):
         raise FileNotFoundError(f"Image not found: {image_path}")
     
-    # Validation check
+    # Single open doubles as the validation check; draft() lets libjpeg
+    # decode large photos at reduced scale since CLIP only needs 224x224
     try:
-        with Image.open(image_path) as img:
-            img.verify()
-    except:
+        image = Image.open(image_path)
+        image.draft("RGB", (CLIP_INPUT_SIZE, CLIP_INPUT_SIZE))
+        return image.convert("RGB")
+    except (UnidentifiedImageError, OSError):
+        return None
+
+
+def _preprocess(image: Image.Image):
+    """CLIP pixel values for one image, on the model's device and dtype."""
+    # Shrink the shortest side to CLIP's input size up front so the processor's
+    # own resize works on a small image; reducing_gap does a fast box pre-shrink
+    w, h = image.size
+    scale = CLIP_INPUT_SIZE / min(w, h)
+    if scale < 1:
+        size = (max(CLIP_INPUT_SIZE, round(w * scale)), max(CLIP_INPUT_SIZE, round(h * scale)))
+        image = image.resize(size, Image.BICUBIC, reducing_gap=3.0)
+    
+    clip = _get_clip()
+    if clip.runtime == "onnx":
+        return _preprocess_numpy(image, clip)
+    
+    inputs = clip.processor(images=image, return_tensors="pt")
+    return inputs["pixel_values"].to(clip.device, clip.dtype)
+
+
+def _preprocess_numpy(image: Image.Image, clip: _Clip) -> np.ndarray:
+    """CLIP preprocessing without the HF processor: resize, center crop, normalize."""
+    w, h = image.size
+    if min(w, h) != CLIP_INPUT_SIZE:
+        scale = CLIP_INPUT_SIZE / min(w, h)
+        size = (max(CLIP_INPUT_SIZE, round(w * scale)), max(CLIP_INPUT_SIZE, round(h * scale)))
+        image = image.resize(size, Image.BICUBIC)
+        w, h = size
+    
+    left = (w - CLIP_INPUT_SIZE) // 2
+    top = (h - CLIP_INPUT_SIZE) // 2
+    image = image.crop((left, top, left + CLIP_INPUT_SIZE, top + CLIP_INPUT_SIZE))
+    
+    arr = np.asarray(image, dtype=np.float32) / 255.0
+    arr = (arr - clip.pixel_mean) / clip.pixel_std
+    return arr.transpose(2, 0, 1)[None]
+
+
+def _concat(batch: list):
+    """Stack per-image pixel values into one batch for the active runtime."""
+    if _get_clip().runtime == "onnx":
+        return np.concatenate(batch)
+    
+    import torch
+    return torch.cat(batch)
+
+
+def _image_probs(pixel_values):
+    """Label probabilities for a batch of images (one row per image)."""
+    clip = _get_clip()
+    if clip.runtime == "onnx":
+        img_feat = clip.session.run(None, {"pixel_values": pixel_values})[0]
+        img_feat = img_feat / np.linalg.norm(img_feat, axis=-1, keepdims=True)
+        logits = (img_feat @ clip.text_feats.T) * clip.logit_scale
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+    
+    import torch
+    
+    # Only the vision tower runs per request; text features are cached
+    with torch.inference_mode():
+        img_feat = clip.image_features(pixel_values)
+        img_feat = img_feat / img_feat.norm(dim=-1, keepdim=True)
+        logits = (img_feat @ clip.text_feats.T) * clip.logit_scale
+        return logits.float().softmax(dim=1)
+
+
+def _to_prediction(probs) -> tuple:
+    """Map one row of label probabilities to (category, confidence)."""
+    # Get all probabilities
+    all_probs = probs.tolist()
+    idx = probs.argmax().item()
+    confidence = probs[idx].item()
+    no_waste_prob = all_probs[4]  # no_waste is index 4
+    
+    # Map back to category keys
+    category_map = {
+        0: "plastic",
+        1: "oil_spill",
+        2: "other_solid_waste",
+        3: "marine_debris",
+        4: "no_waste"
+    }
+    
+    predicted = category_map[idx]
+    
+    # CONFIDENCE THRESHOLD: If confidence is below 85% for pollution categories,
+    # default to no_waste (to avoid false positives)
+    if predicted != "no_waste" and confidence < 0.85:
+        # Check if no_waste probability is reasonable (>15%)
+        if no_waste_prob > 0.15:
+            print(f"🧠 Low confidence ({confidence*100:.1f}%) - defaulting to no_waste")
+            predicted = "no_waste"
+            confidence = no_waste_prob
+    
+    print(f"🧠 CLIP Prediction: {predicted} ({confidence*100:.1f}%)")
+    
+    return predicted, round(confidence, 4)
+
+
+def classify_pollution(image_path: str) -> tuple:
+    """Classify pollution using CLIP AI."""
+    image = _load_image(image_path)
+    if image is None:
         return "other_solid_waste", 0.0
 
-    if USE_CLIP:
-        try:
-            image = Image.open(image_path).convert("RGB")
-            
-            # Labels designed to only match OBVIOUS pollution
-            # Order: plastic, oil_spill, solid_waste, marine_debris, no_waste
-            labels = [
-                "plastic bottles and plastic bags littering a beach with visible garbage",
-                "oil spill petroleum contamination dark brown black murky polluted water",
-                "garbage pile trash heap rubbish dump on sandy beach",
-                "fishing nets ropes tangled in water or on beach shore",
-                "natural clean ocean water waves sea view without any garbage or pollution"
-            ]
-            
-            inputs = processor(text=labels, images=image, return_tensors="pt", padding=True)
-            
-            with torch.no_grad():
-                outputs = model(**inputs)
-                probs = outputs.logits_per_image.softmax(dim=1)[0]
-            
-            # Get all probabilities
-            all_probs = probs.tolist()
-            idx = probs.argmax().item()
-            confidence = probs[idx].item()
-            no_waste_prob = all_probs[4]  # no_waste is index 4
-            
-            # Map back to category keys
-            category_map = {
-                0: "plastic",
-                1: "oil_spill",
-                2: "other_solid_waste",
-                3: "marine_debris",
-                4: "no_waste"
-            }
-            
-            predicted = category_map[idx]
-            
-            # CONFIDENCE THRESHOLD: If confidence is below 85% for pollution categories,
-            # default to no_waste (to avoid false positives)
-            if predicted != "no_waste" and confidence < 0.85:
-                # Check if no_waste probability is reasonable (>15%)
-                if no_waste_prob > 0.15:
-                    print(f"🧠 Low confidence ({confidence*100:.1f}%) - defaulting to no_waste")
-                    predicted = "no_waste"
-                    confidence = no_waste_prob
-            
-            print(f"🧠 CLIP Prediction: {predicted} ({confidence*100:.1f}%)")
-            
-            return predicted, round(confidence, 4)
-            
-        except Exception as e:
-            print(f"CLIP Error: {e}")
+    try:
+        if _get_clip() is None:
+            # Fallback if CLIP fails (should not happen after install)
             return "other_solid_waste", 0.5
+        return _to_prediction(_image_probs(_preprocess(image))[0])
+    except Exception as e:
+        print(f"CLIP Error: {e}")
+        return "other_solid_waste", 0.5
+
+
+class ClipBatcher:
+    """
+    Micro-batches concurrent CLIP requests into a single forward pass.
+    
+    Requests are collected until max_batch are pending or max_wait seconds
+    have passed since the first one, then run together off the event loop.
+    """
+    
+    def __init__(self, max_batch: int = 8, max_wait: float = 0.02):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+    
+    async def submit(self, pixel_values):
+        """Queue one image's pixel values and wait for its probability row."""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((pixel_values, future))
+        return await future
     
-    else:
-        # Fallback if CLIP fails (should not happen after install)
+    async def _drain(self) -> list:
+        loop = asyncio.get_running_loop()
+        items = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(items) < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return items
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = await self._drain()
+            try:
+                batch = _concat([pixels for pixels, _ in items])
+                probs = await loop.run_in_executor(None, _image_probs, batch)
+            except Exception as e:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            for row, (_, future) in zip(probs, items):
+                if not future.done():
+                    future.set_result(row)
+
+
+clip_batcher = ClipBatcher()
+
+
+def _cached_classification(content_hash: str) -> Optional[tuple]:
+    with _classify_cache_lock:
+        result = _classify_cache.get(content_hash)
+        if result is not None:
+            _classify_cache.move_to_end(content_hash)
+        return result
+
+
+def _cache_classification(content_hash: str, result: tuple) -> None:
+    with _classify_cache_lock:
+        _classify_cache[content_hash] = result
+        _classify_cache.move_to_end(content_hash)
+        if len(_classify_cache) > CLASSIFY_CACHE_SIZE:
+            _classify_cache.popitem(last=False)
+
+
+async def aclassify_pollution(image_path: str, content_hash: Optional[str] = None) -> tuple:
+    """
+    Classify pollution using CLIP AI, batched with concurrent requests.
+    
+    If content_hash is given, results are cached under it and identical
+    uploads skip CLIP entirely.
+    """
+    if content_hash:
+        cached = _cached_classification(content_hash)
+        if cached is not None:
+            print(f"🧠 Cached Prediction: {cached[0]} ({cached[1]*100:.1f}%)")
+            return cached
+    
+    # Decoding and preprocessing are CPU-bound; keep them off the event loop
+    image = await asyncio.to_thread(_load_image, image_path)
+    if image is None:
+        return "other_solid_waste", 0.0
+
+    try:
+        # First call loads the model, so do it in a worker thread too
+        if await asyncio.to_thread(_get_clip) is None:
+            # Fallback if CLIP fails (should not happen after install)
+            return "other_solid_waste", 0.5
+        pixel_values = await asyncio.to_thread(_preprocess, image)
+        probs = await clip_batcher.submit(pixel_values)
+        result = _to_prediction(probs)
+        if content_hash:
+            _cache_classification(content_hash, result)
+        return result
+    except Exception as e:
+        print(f"CLIP Error: {e}")
         return "other_solid_waste", 0.5
 
 
-def extract_gps_from_exif(image_path: str) -> dict:
-    """Extract GPS from EXIF."""
+def _read_exif_header(src: Union[str, BinaryIO]) -> bytes:
+    """Read just the start of the file, where the EXIF segment lives."""
+    if hasattr(src, "read"):
+        return src.read(EXIF_HEADER_BYTES)
+    with open(src, "rb") as f:
+        return f.read(EXIF_HEADER_BYTES)
+
+
+def _to_deg(value) -> Optional[float]:
+    """Degrees from an EXIF (deg, min, sec) rational triple, or None if malformed."""
+    if not isinstance(value, (tuple, list)) or len(value) != 3:
+        return None
+    # piexif gives (numerator, denominator) tuples, Pillow gives IFDRational
+    (n0, d0), (n1, d1), (n2, d2) = (
+        part if isinstance(part, tuple) else (part.numerator, part.denominator)
+        for part in value
+    )
+    if not (d0 and d1 and d2):
+        return None
+    return n0 / d0 + n1 / (d1 * 60) + n2 / (d2 * 3600)
+
+
+def _gps_ref(value) -> Optional[str]:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def extract_gps_from_exif(src: Union[str, BinaryIO]) -> dict:
+    """Extract GPS from EXIF (src is a path or a file-like object)."""
     try:
-        img = Image.open(image_path)
-        exif = img._getexif()
-        if not exif: return {'has_gps': False}
-        
-        gps = exif.get(34853)
-        if not gps: return {'has_gps': False}
-        
-        def to_deg(v): return float(v[0]) + float(v[1])/60 + float(v[2])/3600
-        
-        lat = to_deg(gps[2])
-        lon = to_deg(gps[4])
-        
-        if gps.get(1) == 'S': lat = -lat
-        if gps.get(3) == 'W': lon = -lon
-        
-        return {'has_gps': True, 'latitude': lat, 'longitude': lon}
-    except:
+        header = _read_exif_header(src)
+        if USE_PIEXIF:
+            gps = piexif.load(header).get("GPS")
+        else:
+            gps = Image.open(io.BytesIO(header)).getexif().get_ifd(0x8825)
+    except (OSError, ValueError, struct.error):
+        # Unreadable file or no parsable EXIF
         return {'has_gps': False}
+    if not gps: return {'has_gps': False}
+    
+    lat = _to_deg(gps.get(2))
+    lon = _to_deg(gps.get(4))
+    if lat is None or lon is None: return {'has_gps': False}
+    
+    if _gps_ref(gps.get(1)) == 'S': lat = -lat
+    if _gps_ref(gps.get(3)) == 'W': lon = -lon
+    
+    return {'has_gps': True, 'latitude': lat, 'longitude': lon}
 
 
 def validate_image(image_path: str) -> dict:
@@ -158,9 +602,9 @@ def get_pollution_info(ptype: str) -> dict:
     return info.get(ptype, info["other_solid_waste"])
 
 
-def analyze_image(image_path: str) -> dict:
+async def analyze_image(image_path: str, content_hash: Optional[str] = None) -> dict:
     """Wrapper for main classification logic."""
-    label, confidence = classify_pollution(image_path)
+    label, confidence = await aclassify_pollution(image_path, content_hash)
     info = get_pollution_info(label)
     return {
         "label": label,
@@ -171,7 +615,7 @@ def analyze_image(image_path: str) -> dict:
     }
 
 
-def extract_gps_data(image_path: str) -> dict:
+def extract_gps_data(src: Union[str, BinaryIO]) -> dict:
     """Wrapper for GPS extraction."""
-    return extract_gps_from_exif(image_path)
+    return extract_gps_from_exif(src)
 
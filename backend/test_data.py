@@ -4,9 +4,9 @@ Creates sample pollution reports for demonstration purposes
 """
 
 import os
-import random
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from database import init_database, insert_report
+from database import init_database, insert_reports_bulk
 from PIL import Image
 import numpy as np
 
@@ -52,6 +52,20 @@ DESCRIPTIONS = {
     ],
 }
 
+# Sample image colors per pollution type, as uint8 RGB tables
+BASE_COLORS = {
+    "plastic": np.array([200, 220, 230], dtype=np.uint8),  # Light blue-gray
+    "oil_spill": np.array([40, 50, 60], dtype=np.uint8),  # Dark, oily
+    "other_solid_waste": np.array([180, 160, 130], dtype=np.uint8),  # Brown, earthy
+    "marine_debris": np.array([100, 150, 180], dtype=np.uint8),  # Blue-green ocean
+}
+ACCENT_COLORS = {
+    "plastic": np.array([[255, 100, 100], [100, 255, 100], [100, 100, 255]], dtype=np.uint8),
+    "oil_spill": np.array([[20, 25, 30], [60, 50, 40]], dtype=np.uint8),
+    "other_solid_waste": np.array([[139, 90, 43], [210, 180, 140]], dtype=np.uint8),
+    "marine_debris": np.array([[70, 120, 100], [150, 180, 200]], dtype=np.uint8),
+}
+
 
 def create_sample_image(pollution_type: str, filename: str):
     """
@@ -61,42 +75,32 @@ def create_sample_image(pollution_type: str, filename: str):
     # Create image based on pollution type
     size = (400, 300)
     
-    if pollution_type == "plastic":
-        # Bright, colorful for plastic
-        base_color = (200, 220, 230)  # Light blue-gray
-        accent_colors = [(255, 100, 100), (100, 255, 100), (100, 100, 255)]
-    elif pollution_type == "oil_spill":
-        # Dark, oily appearance
-        base_color = (40, 50, 60)
-        accent_colors = [(20, 25, 30), (60, 50, 40)]
-    elif pollution_type == "other_solid_waste":
-        # Brown, earthy tones
-        base_color = (180, 160, 130)
-        accent_colors = [(139, 90, 43), (210, 180, 140)]
-    else:  # marine_debris
-        # Blue-green ocean colors
-        base_color = (100, 150, 180)
-        accent_colors = [(70, 120, 100), (150, 180, 200)]
+    # Unknown types fall back to marine_debris colors
+    base_color = BASE_COLORS.get(pollution_type, BASE_COLORS["marine_debris"])
+    accent_colors = ACCENT_COLORS.get(pollution_type, ACCENT_COLORS["marine_debris"])
     
     # Create base image
     img_array = np.full((size[1], size[0], 3), base_color, dtype=np.uint8)
     
-    # Add some random patterns
-    for _ in range(50):
-        x = random.randint(0, size[0] - 30)
-        y = random.randint(0, size[1] - 30)
-        w = random.randint(10, 40)
-        h = random.randint(10, 40)
-        color = random.choice(accent_colors)
-        img_array[y:y+h, x:x+w] = color
+    # Add some random patterns (all rectangle parameters drawn up front)
+    num_patches = 50
+    xs = np.random.randint(0, size[0] - 30 + 1, num_patches)
+    ys = np.random.randint(0, size[1] - 30 + 1, num_patches)
+    ws = np.random.randint(10, 40 + 1, num_patches)
+    hs = np.random.randint(10, 40 + 1, num_patches)
+    cidx = np.random.randint(0, len(accent_colors), num_patches)
+    for i in range(num_patches):
+        img_array[ys[i]:ys[i]+hs[i], xs[i]:xs[i]+ws[i]] = accent_colors[cidx[i]]
     
-    # Add noise for realism
-    noise = np.random.randint(-20, 20, (size[1], size[0], 3))
-    img_array = np.clip(img_array.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+    # Add noise for realism (the int16 noise array doubles as the work buffer)
+    work = np.random.randint(-20, 20, (size[1], size[0], 3), dtype=np.int16)
+    np.add(work, img_array, out=work)
+    np.clip(work, 0, 255, out=work)
+    img_array[...] = work
     
     # Save image
     img = Image.fromarray(img_array)
-    img.save(filename)
+    img.save(filename, format='JPEG', quality=75, optimize=False)
     
     return filename
 
@@ -115,44 +119,58 @@ def generate_test_data(num_reports: int = 10):
     upload_dir = os.path.join(os.path.dirname(__file__), "uploads")
     os.makedirs(upload_dir, exist_ok=True)
     
-    pollution_types = ["plastic", "oil_spill", "other_solid_waste", "marine_debris"]
+    pollution_types = ("plastic", "oil_spill", "other_solid_waste", "marine_debris")
+    desc_by_type = {ptype: tuple(descs) for ptype, descs in DESCRIPTIONS.items()}
     
     print(f"\n🧪 Generating {num_reports} test pollution reports...\n")
     
+    # Draw all the randomness up front in a few vectorized calls
+    ptype_idx = np.random.randint(0, len(pollution_types), num_reports)
+    loc_idx = np.random.randint(0, len(SAMPLE_LOCATIONS), num_reports)
+    lat_off = np.random.uniform(-0.05, 0.05, num_reports)
+    lng_off = np.random.uniform(-0.05, 0.05, num_reports)
+    desc_pick = np.random.random(num_reports)
+    confidences = np.random.uniform(0.65, 0.95, num_reports).round(2)
+    
+    rows = []
+    image_jobs = []
     for i in range(num_reports):
         # Random pollution type
-        ptype = random.choice(pollution_types)
+        ptype = pollution_types[ptype_idx[i]]
         
         # Random location (with small offset for variety)
-        location = random.choice(SAMPLE_LOCATIONS)
-        lat = location["lat"] + random.uniform(-0.05, 0.05)
-        lng = location["lng"] + random.uniform(-0.05, 0.05)
+        location = SAMPLE_LOCATIONS[loc_idx[i]]
+        lat = location["lat"] + float(lat_off[i])
+        lng = location["lng"] + float(lng_off[i])
         
         # Random description
-        desc = random.choice(DESCRIPTIONS[ptype])
+        descriptions = desc_by_type[ptype]
+        desc = descriptions[int(desc_pick[i] * len(descriptions))]
         
-        # Create sample image
+        # Sample image (rendered after the loop)
         filename = f"test_{i+1}_{ptype}.jpg"
         filepath = os.path.join(upload_dir, filename)
-        create_sample_image(ptype, filepath)
+        image_jobs.append((ptype, filepath))
         
         # Random confidence
-        confidence = round(random.uniform(0.65, 0.95), 2)
+        confidence = float(confidences[i])
         
-        # Insert into database
-        report_id = insert_report(
-            image_path=filename,
-            latitude=lat,
-            longitude=lng,
-            pollution_type=ptype,
-            confidence=confidence,
-            description=desc
-        )
-        
-        print(f"  ✅ Report #{report_id}: {ptype} at {location['name']}")
-        print(f"     📍 ({lat:.4f}, {lng:.4f}) - {confidence:.0%} confidence")
+        rows.append((filename, lat, lng, ptype, confidence, desc, None))
+    
+    # Render and encode the images in parallel (PIL releases the GIL while encoding)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda job: create_sample_image(*job), image_jobs))
+    
+    # Insert into database in one transaction
+    inserted = insert_reports_bulk(rows)
+    
+    # Summarize by type
+    type_counts = np.bincount(ptype_idx, minlength=len(pollution_types))
+    print("\n".join(
+        f"  ✅ {ptype}: {count} reports" for ptype, count in zip(pollution_types, type_counts)
+    ))
     
-    print(f"\n✨ Generated {num_reports} test reports successfully!")
+    print(f"\n✨ Generated {inserted} test reports successfully!")
     print(f"📁 Images saved in: {upload_dir}")
     print("\n💡 You can now view these reports on the map!")
 
@@ -12,6 +12,7 @@ Features:
 import os
 import json
 import random
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from PIL import Image
 
@@ -19,13 +20,24 @@ import torch
 import torch.nn as nn
 import torch.optim as optim
 from torch.utils.data import Dataset, DataLoader
-from torchvision import transforms, models
+from torchvision import io, models
+from torchvision.transforms import v2
 import numpy as np
 
+# Optional: batched GPU augmentation
+try:
+    import kornia.augmentation as K
+    USE_KORNIA = True
+except ImportError:
+    USE_KORNIA = False
+
 print(f"✅ PyTorch {torch.__version__}")
 DEVICE = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
 print(f"   Device: {DEVICE}")
 
+# Every batch has the same shape, so let cuDNN benchmark and cache the fastest conv algorithms
+torch.backends.cudnn.benchmark = True
+
 # Config
 IMG_SIZE = 224
 BATCH_SIZE = 32
@@ -41,8 +53,23 @@ DATASET_DIR = BASE_DIR / 'newdataset'
 MODEL_DIR = BASE_DIR / 'models'
 MODEL_PATH = MODEL_DIR / 'pollution_classifier.pth'
 CLASS_INDICES_PATH = MODEL_DIR / 'class_indices.json'
+VALID_FILES_PATH = MODEL_DIR / 'valid_files.json'
 
 MAX_PER_CLASS = 300
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+# Images are decoded once and kept in RAM at this size (uint8 HWC)
+CACHE_SIZE = 256
+GPU_DECODE_BATCH = 64
+
+# DataLoader workers decode/augment in parallel with training
+NUM_WORKERS = (os.cpu_count() or 2) // 2
+PIN_MEMORY = torch.cuda.is_available()
+
+# With Kornia on CUDA, augmentation runs on whole batches on the GPU instead of per sample in workers
+GPU_AUGMENT = USE_KORNIA and DEVICE.type == 'cuda'
+NORM_MEAN = [0.485, 0.456, 0.406]
+NORM_STD = [0.229, 0.224, 0.225]
 
 
 class BalancedDataset(Dataset):
@@ -55,35 +82,206 @@ class BalancedDataset(Dataset):
         
         print(f"\n📊 Loading dataset ({'train' if is_train else 'val'}):")
         
+        valid_cache = load_valid_cache()
         for category in CATEGORIES:
             cat_dir = self.root_dir / category
             if cat_dir.exists():
-                images = []
-                for ext in ['*.jpg', '*.jpeg', '*.png']:
-                    images.extend(list(cat_dir.glob(ext)))
+                # One directory listing instead of a glob pass per extension
+                with os.scandir(cat_dir) as entries:
+                    images = [
+                        Path(entry.path) for entry in entries
+                        if entry.name.lower().endswith(IMAGE_EXTENSIONS) and entry.is_file()
+                    ]
+                
+                # Corrupt files are dropped once here instead of failing every epoch
+                valid = filter_valid_images(cat_dir, images, valid_cache)
+                if len(valid) < len(images):
+                    print(f"   ⚠️ {category}: skipped {len(images) - len(valid)} unreadable files")
+                images = valid
                 
-                random.shuffle(images)
-                selected = images[:MAX_PER_CLASS]
+                selected = random.sample(images, min(MAX_PER_CLASS, len(images)))
                 
                 for img in selected:
                     self.samples.append((img, self.class_to_idx[category]))
                 
                 print(f"   {category}: {len(selected)} images")
         
+        save_valid_cache(valid_cache)
         random.shuffle(self.samples)
+        self._cache_images()
+    
+    def _cache_images(self):
+        """Decode every image once into a shared uint8 array (reused by all epochs/workers)."""
+        n = len(self.samples)
+        paths = [path for path, _ in self.samples]
+        self.images = np.zeros((n, CACHE_SIZE, CACHE_SIZE, 3), dtype=np.uint8)
+        valid = np.zeros(n, dtype=bool)
+        
+        # On CUDA, JPEGs are decoded in batches by nvJPEG; the rest go through PIL
+        cpu_indices = list(range(n))
+        if DEVICE.type == 'cuda':
+            jpeg_indices = [i for i in cpu_indices if paths[i].suffix.lower() in ('.jpg', '.jpeg')]
+            cpu_indices = [i for i in cpu_indices if paths[i].suffix.lower() not in ('.jpg', '.jpeg')]
+            for start in range(0, len(jpeg_indices), GPU_DECODE_BATCH):
+                batch = jpeg_indices[start:start + GPU_DECODE_BATCH]
+                try:
+                    self.images[batch] = decode_jpegs_gpu([paths[i] for i in batch])
+                    valid[batch] = True
+                except RuntimeError:
+                    # A corrupt file fails the whole batch; retry it file by file on CPU
+                    cpu_indices.extend(batch)
+        
+        # PIL releases the GIL while decoding, so threads scale
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as pool:
+            for i, pixels in zip(cpu_indices, pool.map(decode_image, [paths[i] for i in cpu_indices])):
+                if pixels is not None:
+                    self.images[i] = pixels
+                    valid[i] = True
+        
+        # Files that verified but still failed to decode are dropped, never trained on
+        if not valid.all():
+            keep = np.flatnonzero(valid)
+            print(f"   ⚠️ Dropped {n - len(keep)} images that failed to decode")
+            self.samples = [self.samples[i] for i in keep]
+            self.images = self.images[keep]
+        
+        print(f"   Cached {len(self.samples)}/{n} images in RAM ({self.images.nbytes / 1e6:.0f} MB)")
     
     def __len__(self):
         return len(self.samples)
     
     def __getitem__(self, idx):
-        path, label = self.samples[idx]
-        try:
-            img = Image.open(path).convert('RGB')
-            if self.transform:
-                img = self.transform(img)
-            return img, label
-        except:
-            return torch.zeros((3, IMG_SIZE, IMG_SIZE)), label
+        _, label = self.samples[idx]
+        img = torch.from_numpy(self.images[idx]).permute(2, 0, 1)
+        if self.transform:
+            img = self.transform(img)
+        return img, label
+
+
+def verify_image(path):
+    """Return True if PIL can parse the file's structure (no full decode)."""
+    try:
+        with Image.open(path) as img:
+            img.verify()
+        return True
+    except Exception:
+        # verify() raises a variety of types (OSError, SyntaxError, struct.error...)
+        return False
+
+
+def load_valid_cache():
+    """Load the per-directory verified file lists from VALID_FILES_PATH."""
+    try:
+        with open(VALID_FILES_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_valid_cache(cache):
+    MODEL_DIR.mkdir(parents=True, exist_ok=True)
+    with open(VALID_FILES_PATH, 'w') as f:
+        json.dump(cache, f)
+
+
+def filter_valid_images(cat_dir, images, cache):
+    """Keep the images that pass verify_image; results are reused while the directory mtime is unchanged."""
+    key = str(cat_dir.resolve())
+    mtime = cat_dir.stat().st_mtime
+    entry = cache.get(key)
+    if entry and entry['mtime'] == mtime:
+        names = set(entry['files'])
+        return [path for path in images if path.name in names]
+    
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as pool:
+        ok = list(pool.map(verify_image, images))
+    valid = [path for path, good in zip(images, ok) if good]
+    cache[key] = {'mtime': mtime, 'files': [path.name for path in valid]}
+    return valid
+
+
+def decode_image(path):
+    """Decode an image to a CACHE_SIZE x CACHE_SIZE uint8 RGB array, or None if unreadable."""
+    try:
+        with Image.open(path) as img:
+            # Let libjpeg decode large photos at reduced scale
+            img.draft('RGB', (CACHE_SIZE, CACHE_SIZE))
+            return np.asarray(img.convert('RGB').resize((CACHE_SIZE, CACHE_SIZE)))
+    except (OSError, ValueError):
+        return None
+
+
+class TransformedSubset(Dataset):
+    """Apply a transform on top of a dataset split (train and val augment differently)."""
+    
+    def __init__(self, subset, transform=None):
+        self.subset = subset
+        self.transform = transform
+    
+    def __len__(self):
+        return len(self.subset)
+    
+    def __getitem__(self, idx):
+        img, label = self.subset[idx]
+        if self.transform:
+            img = self.transform(img)
+        return img, label
+
+
+class DataPrefetcher:
+    """Copy the next batch to the GPU on a side stream while the current one trains."""
+    
+    def __init__(self, loader):
+        self.loader = loader
+        self.stream = torch.cuda.Stream() if DEVICE.type == 'cuda' else None
+    
+    def __len__(self):
+        return len(self.loader)
+    
+    def _to_device(self, batch):
+        images, labels = batch
+        # Images go channels_last to match the model's memory format
+        if self.stream is None:
+            return images.to(DEVICE, memory_format=torch.channels_last), labels.to(DEVICE)
+        with torch.cuda.stream(self.stream):
+            return (
+                images.to(DEVICE, memory_format=torch.channels_last, non_blocking=True),
+                labels.to(DEVICE, non_blocking=True),
+            )
+    
+    def __iter__(self):
+        batches = iter(self.loader)
+        next_batch = next(batches, None)
+        if next_batch is not None:
+            next_batch = self._to_device(next_batch)
+        
+        while next_batch is not None:
+            if self.stream is not None:
+                # Wait for the copy, and keep the memory alive for the compute stream
+                torch.cuda.current_stream().wait_stream(self.stream)
+                for tensor in next_batch:
+                    tensor.record_stream(torch.cuda.current_stream())
+            images, labels = next_batch
+            
+            # Start copying batch N+1 before batch N is used
+            next_batch = next(batches, None)
+            if next_batch is not None:
+                next_batch = self._to_device(next_batch)
+            
+            yield images, labels
+
+
+def decode_jpegs_gpu(paths):
+    """Decode and resize a batch of JPEGs with nvJPEG; returns (N, CACHE_SIZE, CACHE_SIZE, 3) uint8."""
+    data = [io.read_file(str(path)) for path in paths]
+    decoded = io.decode_jpeg(data, mode=io.ImageReadMode.RGB, device=DEVICE)
+    resized = [
+        nn.functional.interpolate(img[None].float(), size=(CACHE_SIZE, CACHE_SIZE),
+                                  mode='bilinear', antialias=True, align_corners=False)
+        for img in decoded
+    ]
+    batch = torch.cat(resized).round_().clamp_(0, 255).to(torch.uint8)
+    return batch.permute(0, 2, 3, 1).cpu().numpy()
 
 
 def create_model():
@@ -106,51 +304,108 @@ def create_model():
         nn.Linear(num_features, NUM_CLASSES),
     )
     
-    return model.to(DEVICE)
+    # channels_last (NHWC) lets cuDNN pick Tensor Core conv kernels without transposes
+    model = model.to(DEVICE, memory_format=torch.channels_last)
+    
+    # Fuse EfficientNet's many small pointwise/SE ops with Inductor (CUDA only;
+    # compile time is paid on the first steps and amortized over the epochs).
+    # Default mode, not CUDA graphs: train/eval switches and the ragged last
+    # val batch would otherwise re-record graphs every epoch
+    if DEVICE.type == 'cuda' and hasattr(torch, 'compile'):
+        model = torch.compile(model)
+    
+    return model
 
 
 def get_transforms():
-    train_transform = transforms.Compose([
-        transforms.Resize((256, 256)),
-        transforms.RandomCrop(224),
-        transforms.RandomHorizontalFlip(),
-        transforms.RandomVerticalFlip(p=0.2),
-        transforms.RandomRotation(20),
-        transforms.ColorJitter(brightness=0.2, contrast=0.2, saturation=0.2),
-        transforms.ToTensor(),
-        transforms.Normalize([0.485, 0.456, 0.406], [0.229, 0.224, 0.225])
+    # Dataset images are already cached at CACHE_SIZE (256x256) and arrive as
+    # uint8 CHW tensors; geometric ops run on uint8, then one scaled float conversion
+    train_transform = v2.Compose([
+        v2.RandomCrop(224),
+        v2.RandomHorizontalFlip(),
+        v2.RandomVerticalFlip(p=0.2),
+        v2.RandomRotation(20),
+        v2.ColorJitter(brightness=0.2, contrast=0.2, saturation=0.2),
+        v2.ToDtype(torch.float32, scale=True),
+        v2.Normalize(NORM_MEAN, NORM_STD)
     ])
     
-    val_transform = transforms.Compose([
-        transforms.Resize((224, 224)),
-        transforms.ToTensor(),
-        transforms.Normalize([0.485, 0.456, 0.406], [0.229, 0.224, 0.225])
+    val_transform = v2.Compose([
+        v2.Resize((224, 224), antialias=True),
+        v2.ToDtype(torch.float32, scale=True),
+        v2.Normalize(NORM_MEAN, NORM_STD)
     ])
     
     return train_transform, val_transform
 
 
+def get_gpu_transforms():
+    """Kornia equivalents of get_transforms, applied to whole float batches on the GPU."""
+    mean = torch.tensor(NORM_MEAN)
+    std = torch.tensor(NORM_STD)
+    train_transform = K.AugmentationSequential(
+        K.RandomCrop((IMG_SIZE, IMG_SIZE)),
+        K.RandomHorizontalFlip(),
+        K.RandomVerticalFlip(p=0.2),
+        K.RandomRotation(degrees=20.0, p=1.0),
+        K.ColorJitter(0.2, 0.2, 0.2, 0.0),
+        K.Normalize(mean=mean, std=std),
+        data_keys=['input'],
+    ).to(DEVICE)
+    
+    val_transform = K.AugmentationSequential(
+        K.Resize((IMG_SIZE, IMG_SIZE), antialias=True),
+        K.Normalize(mean=mean, std=std),
+        data_keys=['input'],
+    ).to(DEVICE)
+    
+    return train_transform, val_transform
+
+
+def apply_gpu_transform(transform, images):
+    """Scale a uint8 batch to [0, 1], run the Kornia transform and restore channels_last."""
+    images = transform(images.float().div_(255))
+    return images.contiguous(memory_format=torch.channels_last)
+
+
 def train():
     print("=" * 60)
     print("🌊 EfficientNet Pollution Training")
     print("=" * 60)
     
     train_tf, val_tf = get_transforms()
-    full_ds = BalancedDataset(DATASET_DIR, train_tf)
+    if GPU_AUGMENT:
+        # Workers only hand over cached uint8 images; augmentation happens after the copy
+        print("   Augmentation: Kornia (GPU)")
+        gpu_train_tf, gpu_val_tf = get_gpu_transforms()
+        train_tf = val_tf = None
+    full_ds = BalancedDataset(DATASET_DIR)
     
-    # Split
+    # Split; each side gets its own transform so validation stays deterministic
     train_len = int(0.8 * len(full_ds))
     val_len = len(full_ds) - train_len
-    train_ds, val_ds = torch.utils.data.random_split(full_ds, [train_len, val_len])
+    train_split, val_split = torch.utils.data.random_split(full_ds, [train_len, val_len])
+    train_ds = TransformedSubset(train_split, train_tf)
+    val_ds = TransformedSubset(val_split, val_tf)
     
-    train_loader = DataLoader(train_ds, batch_size=BATCH_SIZE, shuffle=True)
-    val_loader = DataLoader(val_ds, batch_size=BATCH_SIZE)
+    # Worker processes overlap decoding with compute; pinned memory allows async copies
+    loader_kwargs = dict(num_workers=NUM_WORKERS, pin_memory=PIN_MEMORY)
+    if NUM_WORKERS > 0:
+        loader_kwargs.update(persistent_workers=True, prefetch_factor=2)
+    # Drop the ragged last batch so the input shape never changes (keeps cuDNN/compile caches hot)
+    train_loader = DataLoader(train_ds, batch_size=BATCH_SIZE, shuffle=True,
+                              drop_last=len(train_ds) >= BATCH_SIZE, **loader_kwargs)
+    val_loader = DataLoader(val_ds, batch_size=BATCH_SIZE, **loader_kwargs)
     
     model = create_model()
     
     # Optimizer
     optimizer = optim.AdamW(model.parameters(), lr=LEARNING_RATE, weight_decay=0.01)
     criterion = nn.CrossEntropyLoss()
+    
+    # Mixed precision on CUDA (fp16 Tensor Core matmuls); no-op on CPU
+    use_amp = DEVICE.type == 'cuda'
+    scaler = torch.amp.GradScaler("cuda", enabled=use_amp)
     scheduler = optim.lr_scheduler.OneCycleLR(
         optimizer, max_lr=LEARNING_RATE, steps_per_epoch=len(train_loader), epochs=EPOCHS
     )
@@ -160,46 +415,55 @@ def train():
     
     for epoch in range(EPOCHS):
         model.train()
-        train_loss = 0.0
-        train_correct = 0
+        # Running sums stay on the device; read back once per epoch
+        train_loss_t = torch.zeros((), device=DEVICE)
+        train_correct_t = torch.zeros((), dtype=torch.long, device=DEVICE)
         train_total = 0
         
-        for images, labels in train_loader:
-            images, labels = images.to(DEVICE), labels.to(DEVICE)
-            
-            optimizer.zero_grad()
-            outputs = model(images)
-            loss = criterion(outputs, labels)
-            loss.backward()
-            optimizer.step()
+        for images, labels in DataPrefetcher(train_loader):
+            if GPU_AUGMENT:
+                images = apply_gpu_transform(gpu_train_tf, images)
+            optimizer.zero_grad(set_to_none=True)
+            with torch.autocast(device_type=DEVICE.type, enabled=use_amp):
+                outputs = model(images)
+                loss = criterion(outputs, labels)
+            scaler.scale(loss).backward()
+            scaler.step(optimizer)
+            scaler.update()
             scheduler.step()
             
-            train_loss += loss.item()
+            train_loss_t += loss.detach().float()
             _, pred = outputs.max(1)
             train_total += labels.size(0)
-            train_correct += pred.eq(labels).sum().item()
+            train_correct_t += pred.eq(labels).sum()
+        
+        train_loss = train_loss_t.item()
+        train_correct = train_correct_t.item()
             
         # Validation
         model.eval()
-        val_correct = 0
-        val_total = 0
-        class_hits = [0] * NUM_CLASSES
-        class_counts = [0] * NUM_CLASSES
-        
-        with torch.no_grad():
-            for images, labels in val_loader:
-                images, labels = images.to(DEVICE), labels.to(DEVICE)
-                outputs = model(images)
+        # Per-class counts stay on the device until the epoch ends (no per-sample syncs)
+        class_hits_t = torch.zeros(NUM_CLASSES, dtype=torch.long, device=DEVICE)
+        class_counts_t = torch.zeros(NUM_CLASSES, dtype=torch.long, device=DEVICE)
+        
+        # inference_mode also skips autograd's version-counter/view tracking
+        with torch.inference_mode():
+            for images, labels in DataPrefetcher(val_loader):
+                if GPU_AUGMENT:
+                    images = apply_gpu_transform(gpu_val_tf, images)
+                with torch.autocast(device_type=DEVICE.type, enabled=use_amp):
+                    outputs = model(images)
                 _, pred = outputs.max(1)
                 
-                val_total += labels.size(0)
-                val_correct += pred.eq(labels).sum().item()
-                
-                for i in range(len(labels)):
-                    lbl = labels[i].item()
-                    class_counts[lbl] += 1
-                    if pred[i] == lbl:
-                        class_hits[lbl] += 1
+                # Fixed-size scatter-adds; boolean-mask indexing or bincount would size
+                # their output on the host and force a sync per batch
+                class_counts_t.index_add_(0, labels, torch.ones_like(labels))
+                class_hits_t.index_add_(0, labels, pred.eq(labels).long())
+        
+        class_hits = class_hits_t.tolist()
+        class_counts = class_counts_t.tolist()
+        val_correct = sum(class_hits)
+        val_total = sum(class_counts)
         
         train_acc = 100. * train_correct / train_total
         val_acc = 100. * val_correct / val_total
@@ -216,7 +480,8 @@ def train():
         if val_acc > best_acc:
             best_acc = val_acc
             MODEL_DIR.mkdir(parents=True, exist_ok=True)
-            torch.save(model.state_dict(), MODEL_PATH)
+            # Save the underlying module so keys have no torch.compile prefix
+            torch.save(getattr(model, '_orig_mod', model).state_dict(), MODEL_PATH)
             print(f"   💾 Best model saved! ({best_acc:.1f}%)")
             
     # Save indices
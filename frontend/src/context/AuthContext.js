@@ -1,42 +1,62 @@
-import React, { createContext, useState, useEffect, useContext } from 'react';
+import React, { createContext, useState, useEffect, useContext, useRef } from 'react';
 import { jwtDecode } from "jwt-decode";
 import axios from 'axios';
 
 const AuthContext = createContext(null);
 
-export const AuthProvider = ({ children }) => {
+export const AuthProvider = ({ children, apiUrl = 'http://localhost:8000' }) => {
     const [user, setUser] = useState(null);
     const [token, setToken] = useState(localStorage.getItem('token'));
     const [loading, setLoading] = useState(true);
+    // Token issued by login() in this session; its profile is already known
+    const issuedToken = useRef(null);
 
     // Initialize auth state
     useEffect(() => {
         const initAuth = async () => {
-            if (token) {
+            if (token && token !== issuedToken.current) {
+                let decoded;
                 try {
-                    // Check token expiry
-                    const decoded = jwtDecode(token);
-                    const currentTime = Date.now() / 1000;
-
-                    if (decoded.exp < currentTime) {
-                        logout();
-                    } else {
-                        // Set default axios header
-                        axios.defaults.headers.common['Authorization'] = `Bearer ${token}`;
-                        setUser(decoded);
-                    }
+                    decoded = jwtDecode(token);
                 } catch (error) {
                     logout();
+                    setLoading(false);
+                    return;
+                }
+
+                // Check token expiry
+                const currentTime = Date.now() / 1000;
+                if (decoded.exp < currentTime) {
+                    logout();
+                } else {
+                    // Set default axios header
+                    axios.defaults.headers.common['Authorization'] = `Bearer ${token}`;
+
+                    // Token only carries the user id - load the profile from the API
+                    try {
+                        const response = await axios.get(`${apiUrl}/api/auth/me`);
+                        setUser(response.data);
+                    } catch (error) {
+                        const status = error.response?.status;
+                        if (status === 401 || status === 403) {
+                            logout();
+                        } else {
+                            // Network error or server down: stay signed in on the token claims
+                            setUser(decoded);
+                        }
+                    }
                 }
             }
             setLoading(false);
         };
 
         initAuth();
-    }, [token]);
+    }, [token, apiUrl]);
 
     const login = (newToken, userData) => {
         localStorage.setItem('token', newToken);
+        // userData comes with the token, so initAuth skips the /me round-trip
+        issuedToken.current = newToken;
         setToken(newToken);
 
         // Decode token to get user role/info if userData not fully provided
@@ -47,6 +67,7 @@ export const AuthProvider = ({ children }) => {
     };
 
     const logout = () => {
+        issuedToken.current = null;
         localStorage.removeItem('token');
         setToken(null);
         setUser(null);
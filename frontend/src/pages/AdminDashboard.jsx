@@ -12,6 +12,8 @@ L.Icon.Default.mergeOptions({
     shadowUrl: require('leaflet/dist/images/marker-shadow.png'),
 });
 
+const REPORTS_PAGE_SIZE = 1000;
+
 const AdminDashboard = ({ apiUrl }) => {
     const [reports, setReports] = useState([]);
     const [ngos, setNgos] = useState([]);
@@ -26,14 +28,29 @@ const AdminDashboard = ({ apiUrl }) => {
         fetchData();
     }, []);
 
+    // /api/admin/reports is paged newest first; follow the before_id cursor until a short page
+    const fetchAllReports = async () => {
+        const all = [];
+        let beforeId = null;
+        while (true) {
+            const params = { limit: REPORTS_PAGE_SIZE };
+            if (beforeId !== null) params.before_id = beforeId;
+            const { data: page } = await axios.get(`${apiUrl}/api/admin/reports`, { params });
+            all.push(...page);
+            if (page.length < REPORTS_PAGE_SIZE) break;
+            beforeId = page[page.length - 1].id;
+        }
+        return all;
+    };
+
     const fetchData = async () => {
         try {
-            const [reportsRes, ngosRes, statsRes] = await Promise.all([
-                axios.get(`${apiUrl}/api/admin/reports`),
+            const [reportsData, ngosRes, statsRes] = await Promise.all([
+                fetchAllReports(),
                 axios.get(`${apiUrl}/api/ngos`),
                 axios.get(`${apiUrl}/api/stats`)
             ]);
-            setReports(reportsRes.data);
+            setReports(reportsData);
             setNgos(ngosRes.data);
             setStats(statsRes.data);
             setLoading(false);
@@ -30,6 +30,8 @@ const FitBounds = ({ reports }) => {
     return null;
 };
 
+const REPORTS_PAGE_SIZE = 1000;
+
 const MapView = ({ apiUrl = 'http://localhost:8000' }) => {
     const [reports, setReports] = useState([]);
     const [stats, setStats] = useState(null);
@@ -40,18 +42,33 @@ const MapView = ({ apiUrl = 'http://localhost:8000' }) => {
         fetchData();
     }, []);
 
+    // /api/reports is paged newest first; follow the before_id cursor until a short page
+    const fetchAllReports = async () => {
+        const all = [];
+        let beforeId = null;
+        while (true) {
+            const cursor = beforeId === null ? '' : `&before_id=${beforeId}`;
+            const res = await fetch(`${apiUrl}/api/reports?limit=${REPORTS_PAGE_SIZE}${cursor}`);
+            const page = await res.json();
+            if (!Array.isArray(page)) break;
+            all.push(...page);
+            if (page.length < REPORTS_PAGE_SIZE) break;
+            beforeId = page[page.length - 1].id;
+        }
+        return all;
+    };
+
     const fetchData = async () => {
         setLoading(true);
         try {
-            const [reportsRes, statsRes] = await Promise.all([
-                fetch(`${apiUrl}/api/reports`),
+            const [reportsData, statsRes] = await Promise.all([
+                fetchAllReports(),
                 fetch(`${apiUrl}/api/stats`)
             ]);
-            const reportsData = await reportsRes.json();
             const statsData = await statsRes.json();
 
             // Backend returns direct list/dict, not wrapped in {success, reports}
-            setReports(Array.isArray(reportsData) ? reportsData : []);
+            setReports(reportsData);
             setStats(statsData);
         } catch (err) {
             console.error('Map data sync failed');